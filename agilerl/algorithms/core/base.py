@@ -1,13 +1,18 @@
 import copy
 import inspect
+import os
 from abc import ABC, ABCMeta, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from importlib.metadata import version
 from typing import (
     Any,
     Callable,
     Dict,
+    FrozenSet,
     Iterable,
     List,
+    NamedTuple,
     Optional,
     Tuple,
     Type,
@@ -51,6 +56,7 @@ from agilerl.utils.algo_utils import (
     compile_model,
     is_module_list,
     isroutine,
+    packed_to_device,
     preprocess_observation,
     recursive_check_module_attrs,
     remove_compile_prefix,
@@ -85,6 +91,227 @@ class _RegistryMeta(type):
 class RegistryMeta(_RegistryMeta, ABCMeta): ...
 
 
+@lru_cache(maxsize=None)
+def get_init_params(cls: type) -> Tuple[str, ...]:
+    """Returns the names of the parameters of a class constructor. These are cached
+    per class since they are looked up every time an algorithm is cloned or loaded.
+
+    :param cls: The class to inspect.
+    :type cls: type
+
+    :return: Names of the constructor parameters.
+    :rtype: Tuple[str, ...]
+    """
+    return tuple(inspect.signature(cls.__init__).parameters.keys())
+
+
+@lru_cache(maxsize=None)
+def get_method_names(cls: type) -> FrozenSet[str]:
+    """Returns the names of the routines defined on a class. These are cached per class
+    and skipped when inspecting the attributes of an algorithm.
+
+    :param cls: The class to inspect.
+    :type cls: type
+
+    :return: Names of the routines of the class.
+    :rtype: FrozenSet[str]
+    """
+    return frozenset(name for name, val in inspect.getmembers(cls) if isroutine(val))
+
+
+# Version of checkpoints whose tensors are saved in a separate file
+SPLIT_CHECKPOINT_VERSION = 2
+
+
+class TensorRef(NamedTuple):
+    """Placeholder for a tensor saved separately from the rest of a checkpoint."""
+
+    key: str
+
+
+def split_checkpoint_tensors(obj: Any, tensors: Dict[str, torch.Tensor]) -> Any:
+    """Returns a copy of a checkpoint where the tensors nested in dictionaries and lists
+    are replaced by references to the ``tensors`` dictionary, which they're added to.
+
+    :param obj: The checkpoint, or an object nested in it.
+    :type obj: Any
+    :param tensors: Dictionary to add the tensors of the checkpoint to.
+    :type tensors: dict[str, torch.Tensor]
+
+    :return: The checkpoint with references in place of tensors.
+    :rtype: Any
+    """
+    if isinstance(obj, torch.Tensor):
+        key = str(len(tensors))
+        tensors[key] = obj
+        return TensorRef(key)
+    if isinstance(obj, dict):
+        split = copy.copy(obj)
+        for key, value in obj.items():
+            split[key] = split_checkpoint_tensors(value, tensors)
+        return split
+    if isinstance(obj, list):
+        return [split_checkpoint_tensors(value, tensors) for value in obj]
+    return obj
+
+
+def merge_checkpoint_tensors(obj: Any, tensors: Dict[str, torch.Tensor]) -> Any:
+    """Replaces the tensor references in a checkpoint split with
+    :func:`split_checkpoint_tensors` by the tensors they refer to, in place.
+
+    :param obj: The checkpoint, or an object nested in it.
+    :type obj: Any
+    :param tensors: Dictionary of the tensors of the checkpoint.
+    :type tensors: dict[str, torch.Tensor]
+
+    :return: The checkpoint with tensors in place of references.
+    :rtype: Any
+    """
+    if isinstance(obj, TensorRef):
+        return tensors[obj.key]
+    if isinstance(obj, (dict, list)):
+        items = obj.items() if isinstance(obj, dict) else enumerate(obj)
+        for key, value in items:
+            obj[key] = merge_checkpoint_tensors(value, tensors)
+    return obj
+
+
+def load_checkpoint_dict(path: str, device: DeviceType) -> Dict[str, Any]:
+    """Loads a checkpoint saved by an agent and places its tensors on device, copying each
+    tensor to the device individually. When loading onto a device other than the CPU, the
+    file is memory-mapped rather than read into host memory up front, since every tensor
+    is copied out of it. On the CPU it is read into memory, so that the loaded tensors
+    don't alias a file that may later be overwritten, e.g. by saving a checkpoint to the
+    same path. If the tensors of the checkpoint were saved to a separate file, that file
+    is loaded with ``weights_only=True``, skipping the generic unpickler.
+
+    :param path: Location to load checkpoint from.
+    :type path: str
+    :param device: Device to place the tensors of the checkpoint on.
+    :type device: str, torch.device
+
+    :return: The checkpoint dictionary.
+    :rtype: dict[str, Any]
+    """
+    # NOTE: Tensors moved to the CPU are the loaded tensors themselves, which would
+    # otherwise keep referencing the memory-mapped file
+    mmap = torch.device(device).type != "cpu"
+    try:
+        checkpoint = torch.load(path, map_location="cpu", pickle_module=dill, mmap=mmap)
+    except RuntimeError:
+        # Checkpoints saved with the legacy serialization format can't be memory-mapped
+        checkpoint = torch.load(path, map_location="cpu", pickle_module=dill)
+
+    version = checkpoint.pop("checkpoint_version", 1)
+    if version >= SPLIT_CHECKPOINT_VERSION:
+        # Tensors file is saved next to the checkpoint
+        tensors_file = checkpoint.pop("tensors_file")
+        tensors_path = os.path.join(os.path.dirname(os.fspath(path)), tensors_file)
+        tensors = torch.load(
+            tensors_path, map_location="cpu", mmap=mmap, weights_only=True
+        )
+        checkpoint = merge_checkpoint_tensors(checkpoint, tensors)
+
+    return chkpt_attribute_to_device(checkpoint, device)
+
+
+def _is_compatible_module(
+    module: Any, module_cls: Type[EvolvableModule], init_dict: Dict[str, Any]
+) -> bool:
+    """Checks if a module was constructed with the given class and arguments, in which
+    case a saved state dict can be loaded into it instead of reconstructing it.
+
+    :param module: The existing module.
+    :type module: Any
+    :param module_cls: The class of the saved module.
+    :type module_cls: Type[EvolvableModule]
+    :param init_dict: The arguments of the saved module.
+    :type init_dict: dict[str, Any]
+
+    :return: True if the module is compatible with the saved module.
+    :rtype: bool
+    """
+    if type(module) is not module_cls:
+        return False
+
+    return _init_args_equal(module.init_dict, init_dict)
+
+
+def _init_args_equal(a: Any, b: Any) -> bool:
+    """Checks if two sets of module arguments are equal, comparing the arrays and
+    tensors nested in them, e.g. the support of a RainbowQNetwork, by value.
+
+    :param a: The first arguments.
+    :type a: Any
+    :param b: The second arguments.
+    :type b: Any
+
+    :return: True if the arguments are equal.
+    :rtype: bool
+    """
+    if isinstance(a, torch.Tensor) or isinstance(b, torch.Tensor):
+        return (
+            isinstance(a, torch.Tensor)
+            and isinstance(b, torch.Tensor)
+            and a.device == b.device
+            and a.dtype == b.dtype
+            and torch.equal(a, b)
+        )
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return np.array_equal(a, b)
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_init_args_equal(a[k], b[k]) for k in a)
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return (
+            type(a) is type(b)
+            and len(a) == len(b)
+            and all(_init_args_equal(x, y) for x, y in zip(a, b))
+        )
+
+    try:
+        return bool(a == b)
+    except (ValueError, RuntimeError):  # Ambiguous comparisons of arrays or tensors
+        return False
+
+
+def _is_compatible_optimizer(
+    optimizer: Any,
+    opt_dict: Dict[str, Any],
+    name: str,
+    networks: List[EvolvableModule],
+) -> bool:
+    """Checks if an optimizer wrapper was constructed with the same optimizer class and
+    arguments as a saved optimizer, and updates the given networks, in which case the
+    saved state dict can be loaded into it instead of reconstructing it.
+
+    :param optimizer: The existing optimizer.
+    :type optimizer: Any
+    :param opt_dict: The saved optimizer information.
+    :type opt_dict: dict[str, Any]
+    :param name: The attribute name of the optimizer.
+    :type name: str
+    :param networks: The networks the optimizer should update.
+    :type networks: list[EvolvableModule]
+
+    :return: True if the optimizer is compatible with the saved optimizer.
+    :rtype: bool
+    """
+    if not isinstance(optimizer, OptimizerWrapper) or isinstance(
+        optimizer.optimizer_cls, list
+    ):
+        return False
+
+    return (
+        len(optimizer.networks) == len(networks)
+        and all(a is b for a, b in zip(optimizer.networks, networks))
+        and optimizer.optimizer_cls.__name__ == opt_dict[f"{name}_cls"]
+        and optimizer.network_names == opt_dict[f"{name}_networks"]
+        and optimizer.lr_name == opt_dict[f"{name}_lr"]
+        and optimizer.multiagent == opt_dict[f"{name}_multiagent"]
+        and optimizer.optimizer_kwargs == opt_dict[f"{name}_kwargs"]
+    )
+
+
 def get_checkpoint_dict(agent: SelfEvolvableAlgorithm) -> Dict[str, Any]:
     """Returns a dictionary of the agent's attributes to save in a checkpoint.
 
@@ -341,23 +568,31 @@ class EvolvableAlgorithm(ABC, metaclass=RegistryMeta):
         :return: A dictionary of attribute names and their values.
         :rtype: dict[str, Any]
         """
-        # Get all attributes of the current object
-        attributes = inspect.getmembers(agent, lambda a: not isroutine(a))
+        # Get all public attributes of the current object, excluding private and built-in
+        # attributes as well as the methods of its class
+        methods = get_method_names(type(agent))
+        attributes = []
+        for name in dir(agent):
+            if name in methods or name.startswith("_") or name.endswith("_"):
+                continue
+
+            try:
+                value = getattr(agent, name)
+            except AttributeError:
+                continue
+
+            if not isroutine(value):
+                attributes.append((name, value))
 
         # Exclude attributes that are EvolvableModule or Optimizer objects (also check for nested
         # module-related attributes for multi-agent algorithms)
         exclude = list(agent.evolvable_attributes().keys())
         exclude += [attr for attr, val in attributes if isinstance(val, TensorDict)]
 
-        # Exclude private and built-in attributes
-        attributes = [
-            a for a in attributes if not (a[0].startswith("_") or a[0].endswith("_"))
-        ]
-
         # If input_args_only is True, only include attributes that are
         # input arguments to the constructor
         if input_args_only:
-            constructor_params = inspect.signature(agent.__init__).parameters.keys()
+            constructor_params = get_init_params(type(agent))
             attributes = {
                 k: v
                 for k, v in attributes
@@ -371,17 +606,28 @@ class EvolvableAlgorithm(ABC, metaclass=RegistryMeta):
 
     @staticmethod
     def copy_attributes(
-        agent: SelfEvolvableAlgorithm, clone: SelfEvolvableAlgorithm
+        agent: SelfEvolvableAlgorithm,
+        clone: SelfEvolvableAlgorithm,
+        attributes: Optional[Dict[str, Any]] = None,
     ) -> SelfEvolvableAlgorithm:
         """Copies the non-evolvable attributes of the algorithm to a clone.
 
         :param clone: The clone of the algorithm.
         :type clone: SelfEvolvableAlgorithm
+        :param attributes: Attributes of the agent as returned by `inspect_attributes()`, defaults to None
+            whereby they are inspected again.
+        :type attributes: Optional[Dict[str, Any]], optional
 
         :return: The clone of the algorithm.
         :rtype: SelfEvolvableAlgorithm
         """
-        for attribute in EvolvableAlgorithm.inspect_attributes(agent).keys():
+        if attributes is None:
+            attributes = EvolvableAlgorithm.inspect_attributes(agent)
+
+        # Attributes are deep-copied with a shared memo so that objects referenced by more
+        # than one attribute are still shared between the attributes of the clone
+        memo: Dict[int, Any] = {}
+        for attribute in attributes.keys():
             if hasattr(agent, attribute) and hasattr(clone, attribute):
                 attr, clone_attr = getattr(agent, attribute), getattr(clone, attribute)
 
@@ -393,30 +639,26 @@ class EvolvableAlgorithm(ABC, metaclass=RegistryMeta):
                 elif isinstance(attr, torch.Tensor) or isinstance(
                     clone_attr, torch.Tensor
                 ):
-                    if not torch.equal(attr, clone_attr):
-                        try:
-                            setattr(
-                                clone,
-                                attribute,
-                                copy.deepcopy(getattr(agent, attribute)),
-                            )
-                        except RuntimeError:
-                            # If the tensor is not a leaf tensor, we need to clone it using torch.clone
-                            setattr(
-                                clone, attribute, torch.clone(getattr(agent, attribute))
-                            )
+                    # NOTE: Copying unconditionally is as cheap as checking for equality
+                    try:
+                        setattr(clone, attribute, copy.deepcopy(attr, memo))
+                    except RuntimeError:
+                        # If the tensor is not a leaf tensor, we need to clone it using torch.clone
+                        if id(attr) not in memo:
+                            memo[id(attr)] = torch.clone(attr)
+                        setattr(clone, attribute, memo[id(attr)])
 
                 elif isinstance(attr, np.ndarray) or isinstance(clone_attr, np.ndarray):
                     if not np.array_equal(attr, clone_attr):
-                        setattr(
-                            clone, attribute, copy.deepcopy(getattr(agent, attribute))
-                        )
+                        setattr(clone, attribute, copy.deepcopy(attr, memo))
                 elif isinstance(attr, list) or isinstance(clone_attr, list):
-                    setattr(clone, attribute, [copy.deepcopy(el) for el in attr])
+                    setattr(clone, attribute, [copy.deepcopy(el, memo) for el in attr])
                 elif attr != clone_attr:
-                    setattr(clone, attribute, copy.deepcopy(getattr(agent, attribute)))
+                    setattr(clone, attribute, copy.deepcopy(attr, memo))
             else:
-                setattr(clone, attribute, copy.deepcopy(getattr(agent, attribute)))
+                setattr(
+                    clone, attribute, copy.deepcopy(getattr(agent, attribute), memo)
+                )
 
         return clone
 
@@ -616,8 +858,12 @@ class EvolvableAlgorithm(ABC, metaclass=RegistryMeta):
             )
 
         # Inspect evolvable given specs
+        methods = get_method_names(type(self))
         evolvable_attrs = {}
         for attr in dir(self):
+            if attr in methods:
+                continue
+
             obj = getattr(self, attr)
             if is_evolvable(attr, obj):
                 evolvable_attrs[attr] = obj
@@ -661,8 +907,10 @@ class EvolvableAlgorithm(ABC, metaclass=RegistryMeta):
         :return: A clone of the algorithm
         :rtype: EvolvableAlgorithm
         """
-        # Make copy using input arguments
-        input_args = EvolvableAlgorithm.inspect_attributes(self, input_args_only=True)
+        # Make copy using input arguments, which are a subset of the inspected attributes
+        attributes = EvolvableAlgorithm.inspect_attributes(self)
+        init_params = get_init_params(type(self))
+        input_args = {k: v for k, v in attributes.items() if k in init_params}
         input_args["wrap"] = wrap
         clone = type(self)(**input_args)
 
@@ -709,7 +957,7 @@ class EvolvableAlgorithm(ABC, metaclass=RegistryMeta):
             clone.recompile()
 
         # Copy non-evolvable attributes back to clone
-        clone = EvolvableAlgorithm.copy_attributes(self, clone)
+        clone = EvolvableAlgorithm.copy_attributes(self, clone, attributes)
         if index is not None:
             clone.index = index
 
@@ -719,14 +967,28 @@ class EvolvableAlgorithm(ABC, metaclass=RegistryMeta):
 
         return clone
 
-    def save_checkpoint(self, path: str) -> None:
+    def save_checkpoint(self, path: str, split_tensors: bool = False) -> None:
         """Saves a checkpoint of agent properties and network weights to path.
 
         :param path: Location to save checkpoint at
         :type path: string
+        :param split_tensors: Save the tensors of the checkpoint to a separate file at
+            ``{path}.tensors``, which is loaded without the generic unpickler (and
+            memory-mapped when loading onto an accelerator). Defaults to False
+        :type split_tensors: bool, optional
         """
+        checkpoint = get_checkpoint_dict(self)
+        if split_tensors:
+            tensors: Dict[str, torch.Tensor] = {}
+            checkpoint = split_checkpoint_tensors(checkpoint, tensors)
+
+            tensors_path = f"{os.fspath(path)}.tensors"
+            torch.save(tensors, tensors_path)
+            checkpoint["checkpoint_version"] = SPLIT_CHECKPOINT_VERSION
+            checkpoint["tensors_file"] = os.path.basename(tensors_path)
+
         torch.save(
-            get_checkpoint_dict(self),
+            checkpoint,
             path,
             pickle_module=dill,
         )
@@ -737,13 +999,12 @@ class EvolvableAlgorithm(ABC, metaclass=RegistryMeta):
         :param path: Location to load checkpoint from
         :type path: string
         """
-        checkpoint: Dict[str, Any] = torch.load(
-            path, map_location=self.device, pickle_module=dill
-        )
+        checkpoint = load_checkpoint_dict(path, self.device)
 
-        # Recreate evolvable modules
+        # Recreate evolvable modules, reusing those with the same architecture
         network_info: Dict[str, Dict[str, Any]] = checkpoint["network_info"]
         network_names = network_info["network_names"]
+        reused_networks = set()
         for name in network_names:
             net_dict = {
                 k: v for k, v in network_info["modules"].items() if k.startswith(name)
@@ -752,7 +1013,23 @@ class EvolvableAlgorithm(ABC, metaclass=RegistryMeta):
             module_cls = net_dict[f"{name}_cls"]
             state_dict = net_dict[f"{name}_state_dict"]
             init_dict = net_dict[f"{name}_init_dict"]
+            current = getattr(self, name, None)
             if isinstance(module_cls, list):
+                if (
+                    isinstance(current, list)
+                    and len(current) == len(module_cls)
+                    and all(
+                        _is_compatible_module(m, mod, d)
+                        for m, mod, d in zip(current, module_cls, init_dict)
+                    )
+                ):
+                    for m, state in zip(current, state_dict):
+                        if state:
+                            m.load_state_dict(state)
+
+                    reused_networks.add(name)
+                    continue
+
                 loaded_modules = []
                 for mod, d, state in zip(module_cls, init_dict, state_dict):
                     loaded_mod: EvolvableModule = mod(**d)
@@ -763,6 +1040,11 @@ class EvolvableAlgorithm(ABC, metaclass=RegistryMeta):
                     loaded_modules.append(loaded_mod)
 
                 setattr(self, name, loaded_modules)
+            elif _is_compatible_module(current, module_cls, init_dict):
+                if state_dict:
+                    current.load_state_dict(state_dict)
+
+                reused_networks.add(name)
             else:
                 loaded_module: EvolvableModule = module_cls(**init_dict)
 
@@ -780,9 +1062,6 @@ class EvolvableAlgorithm(ABC, metaclass=RegistryMeta):
                 if k.startswith(name)
             }
 
-            # Initialize optimizer
-            opt_kwargs = opt_dict[f"{name}_kwargs"]
-            optimizer_cls = opt_dict[f"{name}_cls"]
             opt_networks = opt_dict[f"{name}_networks"]
             opt_lr = opt_dict[f"{name}_lr"]
             is_multiagent = opt_dict[f"{name}_multiagent"]
@@ -791,6 +1070,19 @@ class EvolvableAlgorithm(ABC, metaclass=RegistryMeta):
                 if is_multiagent
                 else [getattr(self, net) for net in opt_networks]
             )
+
+            # Load state into the existing optimizer if it still updates the same networks
+            current = getattr(self, name, None)
+            if set(opt_networks) <= reused_networks and _is_compatible_optimizer(
+                current, opt_dict, name, networks
+            ):
+                current.lr = getattr(self, opt_lr)
+                current.load_state_dict(opt_dict[f"{name}_state_dict"])
+                continue
+
+            # Initialize optimizer
+            opt_kwargs = opt_dict[f"{name}_kwargs"]
+            optimizer_cls = opt_dict[f"{name}_cls"]
             optimizer = OptimizerWrapper(
                 getattr(torch.optim, optimizer_cls),
                 networks=networks,
@@ -847,9 +1139,7 @@ class EvolvableAlgorithm(ABC, metaclass=RegistryMeta):
         :return: An instance of the algorithm
         :rtype: RLAlgorithm
         """
-        checkpoint: Dict[str, Any] = torch.load(
-            path, map_location=device, pickle_module=dill
-        )
+        checkpoint = load_checkpoint_dict(path, device)
 
         # Reconstruct evolvable modules in algorithm
         print("Checkpoint: ", checkpoint)
@@ -864,34 +1154,64 @@ class EvolvableAlgorithm(ABC, metaclass=RegistryMeta):
                 "Please downgrade to v1.0.30 to load checkpoints from before this change."
             )
 
+        # Reconstruct the algorithm
+        constructor_params = get_init_params(cls)
+        class_init_dict = {
+            k: v for k, v in checkpoint.items() if k in constructor_params
+        }
+
+        checkpoint["accelerator"] = accelerator
+        checkpoint["device"] = device
+        self = cls(**class_init_dict)
+        registry: MutationRegistry = checkpoint["registry"]
+        self.registry = registry
+
+        # Reconstruct evolvable modules, reusing those built by the algorithm with the
+        # same architecture
         network_names = network_info["network_names"]
         loaded_modules: Dict[str, EvolvableAttributeType] = {}
+        reused_networks = set()
         for name in network_names:
             net_dict = {
                 k: v for k, v in network_info["modules"].items() if k.startswith(name)
             }
 
-            # Add device to init dict
+            # NOTE: Tensors in the checkpoint have already been placed on device
             init_dict = net_dict.get(f"{name}_init_dict", None)
             if init_dict is None:
                 raise ValueError(f"Init dict for {name} not found in checkpoint.")
 
-            init_dict = chkpt_attribute_to_device(init_dict, device)
-
             state_dict = net_dict.get(f"{name}_state_dict", None)
             if state_dict is None:
                 raise ValueError(f"State dict for {name} not found in checkpoint.")
 
-            state_dict = chkpt_attribute_to_device(state_dict, device)
-
             # Reconstruct the modules
             module_cls: Union[Type[EvolvableModule], List[Type[EvolvableModule]]] = (
                 net_dict[f"{name}_cls"]
             )
+            current = getattr(self, name, None)
             if isinstance(module_cls, list):
+                for d in init_dict:
+                    d["device"] = device
+
+                if (
+                    isinstance(current, list)
+                    and len(current) == len(module_cls)
+                    and all(
+                        _is_compatible_module(m, mod_cls, d)
+                        for m, mod_cls, d in zip(current, module_cls, init_dict)
+                    )
+                ):
+                    for mod, state in zip(current, state_dict):
+                        if state:
+                            mod.load_state_dict(state)
+
+                    loaded_modules[name] = current
+                    reused_networks.add(name)
+                    continue
+
                 loaded_modules[name] = []
                 for mod_cls, d, state in zip(module_cls, init_dict, state_dict):
-                    d["device"] = device
                     mod: EvolvableModule = mod_cls(**d)
 
                     if state:
@@ -900,7 +1220,11 @@ class EvolvableAlgorithm(ABC, metaclass=RegistryMeta):
                     loaded_modules[name].append(mod)
             else:
                 init_dict["device"] = device
-                module = module_cls(**init_dict)
+                if _is_compatible_module(current, module_cls, init_dict):
+                    module = current
+                    reused_networks.add(name)
+                else:
+                    module = module_cls(**init_dict)
 
                 if (
                     state_dict
@@ -909,18 +1233,6 @@ class EvolvableAlgorithm(ABC, metaclass=RegistryMeta):
 
                 loaded_modules[name] = module
 
-        # Reconstruct the algorithm
-        constructor_params = inspect.signature(cls.__init__).parameters.keys()
-        class_init_dict = {
-            k: v for k, v in checkpoint.items() if k in constructor_params
-        }
-
-        checkpoint["accelerator"] = accelerator
-        checkpoint["device"] = device
-        self = cls(**class_init_dict)
-        registry: MutationRegistry = checkpoint["registry"]
-        self.registry = registry
-
         # Reconstruct optimizers in algorithm
         optimizer_names = network_info["optimizer_names"]
         loaded_optimizers = {}
@@ -931,8 +1243,7 @@ class EvolvableAlgorithm(ABC, metaclass=RegistryMeta):
                 if k.startswith(name)
             }
 
-            # Add device to optimizer kwargs
-            opt_kwargs = chkpt_attribute_to_device(opt_dict[f"{name}_kwargs"], device)
+            opt_kwargs = opt_dict[f"{name}_kwargs"]
             lr = opt_dict[f"{name}_lr"]
             optimizer_cls = opt_dict[f"{name}_cls"]
             opt_networks = opt_dict[f"{name}_networks"]
@@ -943,6 +1254,17 @@ class EvolvableAlgorithm(ABC, metaclass=RegistryMeta):
                 else [loaded_modules[net] for net in opt_networks]
             )
 
+            state_dict = opt_dict[f"{name}_state_dict"]
+
+            # Load state into the existing optimizer if it still updates the same networks
+            current = getattr(self, name, None)
+            if set(opt_networks) <= reused_networks and _is_compatible_optimizer(
+                current, opt_dict, name, networks
+            ):
+                current.load_state_dict(state_dict)
+                loaded_optimizers[name] = current
+                continue
+
             optimizer = OptimizerWrapper(
                 getattr(torch.optim, optimizer_cls),
                 networks=networks,
@@ -952,10 +1274,6 @@ class EvolvableAlgorithm(ABC, metaclass=RegistryMeta):
                 optimizer_kwargs=opt_kwargs,
                 multiagent=opt_dict[f"{name}_multiagent"],
             )
-
-            state_dict = chkpt_attribute_to_device(
-                opt_dict[f"{name}_state_dict"], device
-            )
             optimizer.load_state_dict(state_dict)
             loaded_optimizers[name] = optimizer
 
@@ -992,6 +1310,50 @@ class EvolvableAlgorithm(ABC, metaclass=RegistryMeta):
 
         return self
 
+    @classmethod
+    def load_checkpoints(
+        cls: Type[SelfEvolvableAlgorithm],
+        paths: List[str],
+        device: DeviceType = "cpu",
+        accelerator: Optional[Accelerator] = None,
+    ) -> List[SelfEvolvableAlgorithm]:
+        """Loads a population of algorithms from checkpoints, loading each checkpoint in
+        a separate thread. On CUDA devices each thread copies its checkpoint to the device
+        on its own copy stream so that the transfers overlap, while the agents are built on
+        the calling thread's current stream, which they are then used on.
+
+        :param paths: Locations to load checkpoints from.
+        :type paths: list[str]
+        :param device: Device to load the algorithms on, defaults to 'cpu'
+        :type device: str, optional
+        :param accelerator: Accelerator object for distributed computing, defaults to None
+        :type accelerator: Optional[Accelerator], optional
+
+        :return: Instances of the algorithm, in the same order as the paths
+        :rtype: list[RLAlgorithm]
+        """
+        if not paths:
+            return []
+
+        on_cuda = torch.device(device).type == "cuda"
+
+        # Agents are used on the current stream of the calling thread, so are allocated on
+        # it too. Only the checkpoint copies run on a separate stream, which is waited on
+        # and recorded by chkpt_attribute_to_device
+        caller_stream = torch.cuda.current_stream(device) if on_cuda else None
+
+        def load_on_stream(path: str) -> SelfEvolvableAlgorithm:
+            if not on_cuda:
+                return cls.load(path, device, accelerator)
+
+            with torch.cuda.stream(caller_stream):
+                return cls.load(path, device, accelerator)
+
+        # Wrapping models with an accelerator isn't thread-safe
+        max_workers = len(paths) if accelerator is None else 1
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(load_on_stream, paths))
+
 
 class RLAlgorithm(EvolvableAlgorithm, ABC):
     """Base object for all single-agent algorithms in the AgileRL framework.
@@ -1079,14 +1441,28 @@ class RLAlgorithm(EvolvableAlgorithm, ABC):
         :rtype: Tuple[torch.Tensor[float], ...]
         """
         device = self.device if self.accelerator is None else self.accelerator.device
+
+        # NOTE: Tensors are packed into a single contiguous buffer per dtype so that
+        # moving a batch to a CUDA device costs one (asynchronous) copy rather than one
+        # per field. Non-tensor experiences (e.g. sampled indices) are left untouched
+        tensors = []
+        for exp in experiences:
+            if isinstance(exp, dict):
+                tensors.extend(exp.values())
+            elif isinstance(exp, (list, tuple)) and isinstance(exp[0], torch.Tensor):
+                tensors.extend(exp)
+            elif isinstance(exp, torch.Tensor):
+                tensors.append(exp)
+
+        moved = iter(packed_to_device(tensors, device))
         on_device = []
         for exp in experiences:
             if isinstance(exp, dict):
-                exp = {key: val.to(device) for key, val in exp.items()}
+                exp = {key: next(moved) for key in exp}
             elif isinstance(exp, (list, tuple)) and isinstance(exp[0], torch.Tensor):
-                exp = [val.to(device) for val in exp]
+                exp = [next(moved) for _ in exp]
             elif isinstance(exp, torch.Tensor):
-                exp = exp.to(device)
+                exp = next(moved)
 
             on_device.append(exp)
 
@@ -10,6 +10,21 @@ from agilerl.typing import OptimizerType, StateDict
 
 _Optimizer = Union[OptimizerType, List[OptimizerType]]
 _Module = Union[EvolvableModule, List[EvolvableModule]]
+_Kwargs = Union[Dict[str, Any], List[Dict[str, Any]]]
+
+
+def _without_fused(optimizer_kwargs: _Kwargs) -> _Kwargs:
+    """Returns a copy of the optimizer keyword arguments without the ``fused`` flag.
+
+    :param optimizer_kwargs: The keyword arguments, or a list of them for each network
+    :type optimizer_kwargs: Union[Dict[str, Any], List[Dict[str, Any]]]
+    :return: The keyword arguments without the ``fused`` flag
+    :rtype: Union[Dict[str, Any], List[Dict[str, Any]]]
+    """
+    if isinstance(optimizer_kwargs, list):
+        return [_without_fused(kwargs) for kwargs in optimizer_kwargs]
+
+    return {k: v for k, v in optimizer_kwargs.items() if k != "fused"}
 
 
 class OptimizerWrapper:
@@ -72,13 +87,35 @@ class OptimizerWrapper:
 
         assert self.network_names, "No networks found in the parent container."
 
-        # Initialize the optimizer/s
+        # Initialize the optimizer/s, falling back to the default implementation when the
+        # fused one was requested but isn't supported on the device of the networks, e.g.
+        # when an agent is cloned or loaded onto another device. The keyword arguments that
+        # worked are kept, so that they are the ones saved in checkpoints
+        try:
+            self.optimizer = self._init_optimizer()
+        except RuntimeError:
+            optimizer_kwargs = _without_fused(self.optimizer_kwargs)
+            if optimizer_kwargs == self.optimizer_kwargs:
+                raise
+
+            self.optimizer_kwargs = optimizer_kwargs
+            self.optimizer = self._init_optimizer()
+
+    def _init_optimizer(self) -> _Optimizer:
+        """Initializes the optimizer/s of the networks.
+
+        :return: The optimizer, or list of optimizers for multi-agent algorithms
+        :rtype: Union[Optimizer, List[Optimizer]]
+        """
+        optimizer_cls = self.optimizer_cls
+        optimizer_kwargs = self.optimizer_kwargs
+
         # NOTE: For multi-agent algorithms, we want to have a different optimizer
         # for each of the networks in the passed list
         multiple_attrs = len(self.network_names) > 1
         multiple_networks = len(self.networks) > 1
-        if multiagent:
-            self.optimizer = []
+        if self.multiagent:
+            optimizers = []
             for i, net in enumerate(self.networks):
                 optimizer = (
                     optimizer_cls[i]
@@ -90,7 +127,9 @@ class OptimizerWrapper:
                     if isinstance(self.optimizer_kwargs, list)
                     else self.optimizer_kwargs
                 )
-                self.optimizer.append(optimizer(net.parameters(), lr=self.lr, **kwargs))
+                optimizers.append(optimizer(net.parameters(), lr=self.lr, **kwargs))
+
+            return optimizers
 
         # Single-agent algorithms with multiple networks for a single optimizer
         elif multiple_networks and multiple_attrs:
@@ -110,7 +149,7 @@ class OptimizerWrapper:
                 )
                 opt_args.append({"params": net.parameters(), "lr": self.lr, **kwargs})
 
-            self.optimizer = optimizer_cls(opt_args)
+            return optimizer_cls(opt_args)
 
         # Single-agent algorithms with a single network for a single optimizer
         else:
@@ -120,7 +159,7 @@ class OptimizerWrapper:
             assert isinstance(
                 self.optimizer_kwargs, dict
             ), "Expected a single dictionary of optimizer keyword arguments."
-            self.optimizer = optimizer_cls(
+            return optimizer_cls(
                 self.networks[0].parameters(), lr=self.lr, **self.optimizer_kwargs
             )
 
@@ -239,16 +278,19 @@ class OptimizerWrapper:
 
         return self.optimizer.state_dict()
 
-    def zero_grad(self) -> None:
+    def zero_grad(self, set_to_none: bool = True) -> None:
         """
         Zero the gradients of the optimizer.
+
+        :param set_to_none: Set the gradients to None instead of zero, defaults to True
+        :type set_to_none: bool, optional
         """
         if self.multiagent:
             optimizers: List[Optimizer] = self.optimizer
             for opt in optimizers:
-                opt.zero_grad()
+                opt.zero_grad(set_to_none=set_to_none)
         else:
-            self.optimizer.zero_grad()
+            self.optimizer.zero_grad(set_to_none=set_to_none)
 
     def step(self) -> None:
         """
@@ -1,9 +1,13 @@
+import warnings
 from typing import Any, Dict, Optional, Tuple
 
 import numpy as np
 import torch
+import torch._dynamo
+import torch.nn as nn
 import torch.optim as optim
 from gymnasium import spaces
+from tensordict.nn import CudaGraphModule
 from torch.nn.utils import clip_grad_norm_
 
 from agilerl.algorithms.core import RLAlgorithm
@@ -11,6 +15,7 @@ from agilerl.algorithms.core.registry import HyperparameterConfig, NetworkGroup
 from agilerl.algorithms.core.wrappers import OptimizerWrapper
 from agilerl.modules.base import EvolvableModule
 from agilerl.modules.configs import MlpNetConfig
+from agilerl.modules.multi_input import EvolvableMultiInput
 from agilerl.networks.q_networks import RainbowQNetwork
 from agilerl.typing import (
     ArrayLike,
@@ -19,10 +24,96 @@ from agilerl.typing import (
     ObservationType,
     TorchObsType,
 )
-from agilerl.utils.algo_utils import make_safe_deepcopies, obs_channels_to_first
+from agilerl.utils.algo_utils import (
+    contains_image_space,
+    make_safe_deepcopies,
+    obs_channels_to_first,
+)
 from agilerl.wrappers.make_evolvable import MakeEvolvable
 
 
+def _project_distribution(
+    target_q_dist: torch.Tensor,
+    rewards: torch.Tensor,
+    dones: torch.Tensor,
+    support: torch.Tensor,
+    v_min: float,
+    v_max: float,
+    delta_z: float,
+    num_atoms: int,
+    gamma: float,
+    proj_dist: torch.Tensor,
+) -> torch.Tensor:
+    """Projects the Bellman-updated target distribution onto the fixed support of
+    the categorical (C51) value distribution.
+
+    :param target_q_dist: Target distribution for the greedy next actions, shape (batch_size, num_atoms)
+    :type target_q_dist: torch.Tensor
+    :param rewards: Batch of rewards received
+    :type rewards: torch.Tensor
+    :param dones: Batch of done flags indicating episode termination
+    :type dones: torch.Tensor
+    :param support: Support of the value distribution
+    :type support: torch.Tensor
+    :param v_min: Minimum value of support
+    :type v_min: float
+    :param v_max: Maximum value of support
+    :type v_max: float
+    :param delta_z: Distance between neighbouring atoms of the support
+    :type delta_z: float
+    :param num_atoms: Number of atoms in the support
+    :type num_atoms: int
+    :param gamma: Discount factor
+    :type gamma: float
+    :param proj_dist: Buffer the projected distribution is written into, shape (batch_size, num_atoms)
+    :type proj_dist: torch.Tensor
+    :return: Projected target distribution
+    :rtype: torch.Tensor
+    """
+    # Determine the target z values, fusing the broadcast over the support into one kernel
+    t_z = torch.addcmul(rewards, (1 - dones) * gamma, support)
+    t_z.clamp_(min=v_min, max=v_max)
+
+    # Finds closest support element index value
+    b = (t_z - v_min) / delta_z
+
+    # Find the neighbouring indices of b
+    L = b.floor().long()
+    u = b.ceil().long()
+
+    # Shape of projected q distribution is (batch_size, num_atoms) as we have argmaxed over actions
+    # Fix disappearing probability mass
+    L = torch.where((u > 0) & (L == u), L - 1, L)
+    u = torch.where((L < (num_atoms - 1)) & (L == u), u + 1, u)
+    L_float, u_float = L.float(), u.float()
+
+    # Distribute the probability mass of each atom onto its neighbouring atoms
+    proj_dist.zero_()
+    proj_dist.scatter_add_(1, L, target_q_dist * (u_float - b))
+    proj_dist.scatter_add_(1, u, target_q_dist * (b - L_float))
+
+    return proj_dist
+
+
+def _to_channels_last(obs: TorchObsType) -> TorchObsType:
+    """Converts the image tensors of a preprocessed observation to the channels-last
+    memory format. Non-image tensors are returned as-is.
+
+    :param obs: Preprocessed observation
+    :type obs: torch.Tensor, dict[str, torch.Tensor], tuple[torch.Tensor]
+    :return: Observation with image tensors in channels-last memory format
+    :rtype: torch.Tensor, dict[str, torch.Tensor], tuple[torch.Tensor]
+    """
+    if isinstance(obs, dict):
+        return {key: _to_channels_last(val) for key, val in obs.items()}
+    elif isinstance(obs, tuple):
+        return tuple(_to_channels_last(val) for val in obs)
+    elif isinstance(obs, torch.Tensor) and obs.dim() == 4:
+        return obs.contiguous(memory_format=torch.channels_last)
+
+    return obs
+
+
 class RainbowDQN(RLAlgorithm):
     """The Rainbow DQN algorithm class. Rainbow DQN paper: https://arxiv.org/abs/1710.02298
 
@@ -64,12 +155,25 @@ class RainbowDQN(RLAlgorithm):
     :type mut: str, optional
     :param combined_reward: Boolean flag indicating whether to use combined 1-step and n-step reward, defaults to False
     :type combined_reward: bool, optional
+    :param quantize_inference: Select actions with a dynamically int8-quantized copy of the actor, only
+        supported on CPU. Only the encoder's linear layers are quantized, the NoisyLinear layers of the
+        value and advantage heads are kept in full precision, defaults to False
+    :type quantize_inference: bool, optional
+    :param mixed_precision: Run the network forward passes of the learn step under bfloat16 autocast,
+        ignored when using an accelerator (which manages mixed precision itself), defaults to False
+    :type mixed_precision: bool, optional
     :param actor_network: Custom actor network, defaults to None
     :type actor_network: nn.Module, optional
     :param device: Device for accelerated computing, 'cpu' or 'cuda', defaults to 'cpu'
     :type device: str, optional
-    :param accelerator: Accelerator for distributed computing, defaults to None
+    :param accelerator: Accelerator for distributed computing, defaults to None. Options of the
+        underlying DistributedDataParallel wrapper (e.g. ``gradient_as_bucket_view``, ``static_graph``)
+        can be set through the accelerator's ``DistributedDataParallelKwargs`` handler.
     :type accelerator: accelerate.Accelerator(), optional
+    :param torch_compiler: The torch compile mode 'default', 'reduce-overhead' or 'max-autotune', defaults to None
+    :type torch_compiler: str, optional
+    :param cudagraphs: Use CUDA graphs for optimization, defaults to False
+    :type cudagraphs: bool, optional
     :param wrap: Wrap models for distributed training upon creation, defaults to True
     :type wrap: bool, optional
     """
@@ -96,9 +200,13 @@ class RainbowDQN(RLAlgorithm):
         mut: Optional[str] = None,
         normalize_images: bool = True,
         combined_reward: bool = False,
+        quantize_inference: bool = False,
+        mixed_precision: bool = False,
         actor_network: Optional[EvolvableModule] = None,
         device: str = "cpu",
         accelerator: Optional[Any] = None,
+        torch_compiler: Optional[str] = None,
+        cudagraphs: bool = False,
         wrap: bool = True,
     ) -> None:
         super().__init__(
@@ -108,6 +216,7 @@ class RainbowDQN(RLAlgorithm):
             hp_config=hp_config,
             device=device,
             accelerator=accelerator,
+            torch_compiler=torch_compiler,
             normalize_images=normalize_images,
             name="Rainbow DQN",
         )
@@ -140,6 +249,12 @@ class RainbowDQN(RLAlgorithm):
         ), "Maximum value of support must be greater than or equal to minimum value."
         assert isinstance(n_step, int), "Step number must be an integer."
         assert n_step >= 1, "Step number must be greater than or equal to one."
+        assert isinstance(
+            quantize_inference, bool
+        ), "Quantize inference flag must be boolean value True or False."
+        assert isinstance(
+            mixed_precision, bool
+        ), "Mixed precision flag must be boolean value True or False."
         assert isinstance(
             wrap, bool
         ), "Wrap models flag must be boolean value True or False."
@@ -159,11 +274,22 @@ class RainbowDQN(RLAlgorithm):
         self.mut = mut
         self.combined_reward = combined_reward
         self.noise_std = noise_std
+        self.quantize_inference = quantize_inference
+        self.mixed_precision = mixed_precision
+        self.cudagraphs = cudagraphs
+        self.capturable = cudagraphs
+
+        # Convolutions on CUDA run faster on NHWC Tensor Core kernels
+        self._channels_last = (
+            contains_image_space(observation_space)
+            and torch.device(self.device).type == "cuda"
+        )
 
         self.support = torch.linspace(
             self.v_min, self.v_max, self.num_atoms, device=self.device
         )
         self.delta_z = (self.v_max - self.v_min) / (self.num_atoms - 1)
+        self.init_batch_buffers()
 
         if actor_network is not None:
             if isinstance(actor_network, MakeEvolvable):
@@ -178,9 +304,9 @@ class RainbowDQN(RLAlgorithm):
                     f"'actor_network' argument is of type {type(actor_network)}, but must be of type EvolvableModule."
                 )
 
-            self.actor, self.actor_target = make_safe_deepcopies(
-                actor_network, actor_network
-            )
+            # Target is cloned from the actor's init dict and weights rather than deep-copied
+            self.actor = make_safe_deepcopies(actor_network)
+            self.actor_target = self.actor.clone()
         else:
             net_config = {} if net_config is None else net_config
             head_config: Optional[Dict[str, Any]] = net_config.get("head_config", None)
@@ -210,23 +336,202 @@ class RainbowDQN(RLAlgorithm):
             self.actor = create_actor()
             self.actor_target = create_actor()
 
-        # Create the target network by copying the actor network
-        self.actor_target.load_state_dict(self.actor.state_dict())
+            # Create the target network by copying the actor network
+            self.actor_target.load_state_dict(self.actor.state_dict())
 
-        # Optimizer
-        self.optimizer = OptimizerWrapper(optim.Adam, networks=self.actor, lr=self.lr)
+        self.to_channels_last()
+
+        # Optimizer, using the fused Adam implementation where the device supports it
+        self.optimizer = OptimizerWrapper(
+            optim.Adam,
+            networks=self.actor,
+            lr=self.lr,
+            optimizer_kwargs={"capturable": self.capturable, "fused": True},
+        )
 
         if self.accelerator is not None and wrap:
             self.wrap_models()
+        elif self.torch_compiler:
+            torch.set_float32_matmul_precision("high")
+            self.recompile()
+
+        # NOTE: The projection is compiled in the default mode since CUDA graphs
+        # would reuse its output buffer across the 1-step and n-step losses. It is
+        # traced as part of the update instead when the update is captured
+        self._compiled_projection = (
+            torch.compile(_project_distribution)
+            if self.torch_compiler and not self._capture_update
+            else _project_distribution
+        )
 
         # Put the nets into training mode
         self.actor.train()
         self.actor_target.train()
+        self.init_soft_update_params()
+
+        # Dynamic quantization kernels are CPU-only and don't support compiled, distributed
+        # or multi-input networks
+        if self.quantize_inference and (
+            str(self.device) != "cpu"
+            or self.accelerator is not None
+            or self.torch_compiler
+            or isinstance(getattr(self.actor, "encoder", None), EvolvableMultiInput)
+        ):
+            warnings.warn(
+                "Quantized inference is only supported for non-compiled, single-input networks "
+                "on CPU, falling back to full precision inference."
+            )
+            self.quantize_inference = False
+
+        self._quantized_actor: Optional[EvolvableModule] = None
+        self._quantized_actor_stale = False
+
+        # torch.compile and cuda graph optimizations
+        if self.cudagraphs:
+            if self.accelerator is not None:
+                warnings.warn(
+                    "CUDA graphs are not supported with an accelerator, running the update eagerly."
+                )
+            else:
+                warnings.warn(
+                    "CUDA graphs for Rainbow DQN are implemented experimentally and may not work as expected."
+                )
+
+        self.init_update_fn()
 
         # Register network groups for mutations
         self.register_network_group(
             NetworkGroup(eval=self.actor, shared=self.actor_target, policy=True)
         )
+        self.register_init_hook(self.init_soft_update_params)
+        self.register_init_hook(self.reset_quantized_actor)
+        self.register_init_hook(self.to_channels_last)
+        self.register_init_hook(self.init_batch_buffers)
+        self.register_init_hook(self.init_update_fn)
+
+    @property
+    def _capture_update(self) -> bool:
+        """Whether the update is compiled and captured in a CUDA graph."""
+        return self.cudagraphs and self.accelerator is None
+
+    def init_batch_buffers(self) -> None:
+        """Allocates the batch index and projected target distribution buffers used in
+        the loss, for the current batch size."""
+        # Index over the batch dimension used to gather per-sample distributions
+        self._batch_idxs = torch.arange(self.batch_size, device=self.device)
+
+        # Projected target distribution buffers for the 1-step and n-step losses. These
+        # are kept separate since both are needed by autograd until the backward pass
+        self._proj_dist_bufs = tuple(
+            torch.zeros(self.batch_size, self.num_atoms, device=self.device)
+            for _ in range(2)
+        )
+
+    def init_update_fn(self) -> None:
+        """Builds the function the actor is updated with in the learn step. With ``cudagraphs``
+        set, this is the compiled update captured in a CUDA graph, which is rebuilt whenever
+        the networks, optimizer or batch size change so that it never replays stale buffers.
+        """
+        if self._capture_update:
+            self._update_fn = CudaGraphModule(torch.compile(self.update, mode=None))
+        else:
+            self._update_fn = self.update
+
+    def init_soft_update_params(self) -> None:
+        """Caches the parameters of the actor and target networks used in the soft update."""
+        self._actor_params = list(self.actor.parameters())
+        self._target_params = list(self.actor_target.parameters())
+
+    def _wrap_attr(self, attr: Any) -> Any:
+        """Wraps the model with the accelerator. The target network never receives gradients,
+        so it is only placed on the accelerator device rather than wrapped for distributed
+        data parallel training, which would synchronise its buffers on every forward pass.
+
+        :param attr: The attribute to wrap.
+        :type attr: EvolvableAttributeType
+
+        :return: The wrapped attribute.
+        :rtype: EvolvableModule
+        """
+        if attr is self.actor_target:
+            return attr.to(self.accelerator.device)
+
+        return super()._wrap_attr(attr)
+
+    def to_channels_last(self) -> None:
+        """Converts the convolutional weights of the actor and target networks to the
+        channels-last memory format when learning from images on a CUDA device."""
+        if self._channels_last:
+            self.actor.to(memory_format=torch.channels_last)
+            self.actor_target.to(memory_format=torch.channels_last)
+
+    def preprocess_observation(self, observation: ObservationType) -> TorchObsType:
+        """Preprocesses observations for forward pass through neural network, converting
+        images to the channels-last memory format if the networks use it.
+
+        :param observation: Observations of environment
+        :type observation: ObservationType
+
+        :return: Preprocessed observations
+        :rtype: torch.Tensor[float] or dict[str, torch.Tensor[float]] or Tuple[torch.Tensor[float], ...]
+        """
+        observation = super().preprocess_observation(observation)
+        if self._channels_last:
+            observation = _to_channels_last(observation)
+
+        return observation
+
+    def reset_quantized_actor(self) -> None:
+        """Discards the quantized copy of the actor so that it is rebuilt from the latest
+        architecture, e.g. after a mutation."""
+        self._quantized_actor = None
+        self._quantized_actor_stale = False
+
+    def _inference_actor(self) -> EvolvableModule:
+        """Returns the network used to select actions. This is a dynamically int8-quantized copy
+        of the actor if ``quantize_inference`` is set. Its weights are re-quantized lazily, on the
+        first call after the actor is updated, rather than after every learning step.
+
+        :return: Network used to select actions
+        :rtype: EvolvableModule
+        """
+        if not self.quantize_inference:
+            return self.actor
+
+        if self._quantized_actor is None:
+            self._quantized_actor = torch.ao.quantization.quantize_dynamic(
+                self.actor, {nn.Linear}, dtype=torch.qint8
+            )
+        elif self._quantized_actor_stale:
+            self._requantize_actor()
+
+        self._quantized_actor_stale = False
+        return self._quantized_actor
+
+    @torch.no_grad()
+    def _requantize_actor(self) -> None:
+        """Updates the quantized copy of the actor in place from the actor's latest weights,
+        instead of copying and quantizing the whole actor again."""
+        actor_tensors = dict(self.actor.named_parameters())
+        actor_tensors.update(self.actor.named_buffers())
+
+        # Layers left in full precision, e.g. the NoisyLinear heads and their noise
+        for name, tensor in self._quantized_actor.named_parameters():
+            tensor.copy_(actor_tensors[name])
+        for name, tensor in self._quantized_actor.named_buffers():
+            tensor.copy_(actor_tensors[name])
+
+        # Quantized linear layers, with the weight observer quantize_dynamic uses
+        for name, module in self._quantized_actor.named_modules():
+            if isinstance(module, torch.ao.nn.quantized.dynamic.Linear):
+                linear = self.actor.get_submodule(name)
+                observer = torch.ao.quantization.default_dynamic_qconfig.weight()
+                observer(linear.weight)
+                scale, zero_point = observer.calculate_qparams()
+                weight = torch.quantize_per_tensor(
+                    linear.weight.float(), float(scale), int(zero_point), torch.qint8
+                )
+                module.set_weight_bias(weight, linear.bias)
 
     def get_action(
         self,
@@ -247,28 +552,42 @@ class RainbowDQN(RLAlgorithm):
         """
         obs = self.preprocess_observation(obs)
 
-        self.actor.train(mode=training)
-        with torch.no_grad():
-            action_values = self.actor(obs)
+        actor = self._inference_actor()
+        actor.train(mode=training)
+        action = self._get_action(obs, action_mask).cpu().numpy()
+        actor.train()
 
-        if action_mask is None:
-            action = np.argmax(action_values.cpu().data.numpy(), axis=-1)
-        else:
+        return action
+
+    def _get_action(
+        self, obs: TorchObsType, action_mask: Optional[np.ndarray] = None
+    ) -> torch.Tensor:
+        """Returns the greedy actions for a batch of preprocessed observations.
+
+        :param obs: Preprocessed state observations
+        :type obs: torch.Tensor, dict[str, torch.Tensor], tuple[torch.Tensor]
+        :param action_mask: Mask of legal actions 1=legal 0=illegal, defaults to None
+        :type action_mask: numpy.ndarray, optional
+        :return: The actions to take, on the same device as the actor
+        :rtype: torch.Tensor
+        """
+        with torch.inference_mode():
+            action_values = self._inference_actor()(obs)
+
+        if action_mask is not None:
             # Need to stack if vectorized env
             action_mask = (
                 np.stack(action_mask)
                 if action_mask.dtype == np.object_ or isinstance(action_mask, list)
                 else action_mask
             )
-            inv_mask = 1 - action_mask
-            masked_action_values = np.ma.array(
-                action_values.cpu().data.numpy(), mask=inv_mask
+            action_mask = torch.as_tensor(
+                action_mask, device=action_values.device, dtype=torch.bool
             )
-            action = np.argmax(masked_action_values, axis=-1)
-
-        self.actor.train()
+            action_values = action_values.masked_fill(~action_mask, float("-inf"))
 
-        return action
+        # Select greedy actions on device so only the indices need to be transferred
+        return action_values.argmax(dim=-1)
 
     def _dqn_loss(
         self,
@@ -278,85 +597,210 @@ class RainbowDQN(RLAlgorithm):
         next_states: torch.Tensor,
         dones: torch.Tensor,
         gamma: float,
+        n_step: bool = False,
     ) -> torch.Tensor:
         """Calculates the DQN loss.
 
-        :param states: Batch of current states
+        :param states: Batch of preprocessed current states
         :type states: torch.Tensor
         :param actions: Batch of actions taken
         :type actions: torch.Tensor
         :param rewards: Batch of rewards received
         :type rewards: torch.Tensor
-        :param next_states: Batch of next states
+        :param next_states: Batch of preprocessed next states
         :type next_states: torch.Tensor
         :param dones: Batch of done flags indicating episode termination
         :type dones: torch.Tensor
         :param gamma: Discount factor
         :type gamma: float
+        :param n_step: Flag indicating the experiences are n-step transitions, defaults to False
+        :type n_step: bool, optional
         :return: Element-wise loss
         :rtype: torch.Tensor
         """
-        states = self.preprocess_observation(states)
-        next_states = self.preprocess_observation(next_states)
-
         with torch.no_grad():
+            with self._autocast():
+                # Predict next actions from next_states
+                next_actions = self.actor(next_states).argmax(1)
 
-            # Predict next actions from next_states
-            next_actions = self.actor(next_states).argmax(1)
+                # Predict the target q distribution for the same next states
+                target_q_dist = self.actor_target(next_states, q=False)
 
-            # Predict the target q distribution for the same next states
-            target_q_dist = self.actor_target(next_states, q=False)
+            # Projection is always carried out in full precision
+            target_q_dist = target_q_dist.float()
 
             # Index the target q_dist to select the distributions corresponding to next_actions
-            target_q_dist = target_q_dist[range(self.batch_size), next_actions]
-
-            # Determine the target z values
-            t_z = rewards + (1 - dones) * gamma * self.support
-            t_z = t_z.clamp(min=self.v_min, max=self.v_max)
-
-            # Finds closest support element index value
-            b = (t_z - self.v_min) / self.delta_z
-
-            # Find the neighbouring indices of b
-            L = b.floor().long()
-            u = b.ceil().long()
-
-            # Shape of projected q distribution is (batch_size, num_atoms) as we have argmaxed over actions
-            # Fix disappearing probability mass
-            L[(u > 0) * (L == u)] -= 1
-            u[(L < (self.num_atoms - 1)) * (L == u)] += 1
-            offset = (
-                torch.linspace(
-                    0,
-                    (self.batch_size - 1) * self.num_atoms,
-                    self.batch_size,
-                    device=self.device,
-                )
-                .long()
-                .unsqueeze(1)
-                .expand(self.batch_size, self.num_atoms)
-            )
-            proj_dist = torch.zeros(target_q_dist.size(), device=self.device)
+            target_q_dist = target_q_dist[self._batch_idxs, next_actions]
 
-            proj_dist.view(-1).index_add_(
-                0, (L + offset).view(-1), (target_q_dist * (u.float() - b)).view(-1)
-            )
-            proj_dist.view(-1).index_add_(
-                0, (u + offset).view(-1), (target_q_dist * (b - L.float())).view(-1)
+            # Project the target distribution onto the support
+            proj_dist = self._project_target_dist(
+                target_q_dist, rewards, dones, gamma, self._proj_dist_bufs[int(n_step)]
             )
 
         # Calculate the current obs
-        log_q_dist = self.actor(states, q=False, log=True)
-        log_p = log_q_dist[range(self.batch_size), actions.squeeze().long()]
+        with self._autocast():
+            log_q_dist = self.actor(states, q=False, log=True)
+
+        log_q_dist = log_q_dist.float()
+        log_p = log_q_dist[self._batch_idxs, actions.squeeze().long()]
 
         # loss
         elementwise_loss = -(proj_dist * log_p).sum(1)
         return elementwise_loss
 
+    def _autocast(self) -> torch.autocast:
+        """Returns the bfloat16 autocast context used for the network forward passes in the
+        learn step, which is disabled unless ``mixed_precision`` is set.
+
+        :return: Autocast context manager
+        :rtype: torch.autocast
+        """
+        return torch.autocast(
+            device_type=torch.device(self.device).type,
+            dtype=torch.bfloat16,
+            enabled=self.mixed_precision and self.accelerator is None,
+        )
+
+    def _project_target_dist(
+        self,
+        target_q_dist: torch.Tensor,
+        rewards: torch.Tensor,
+        dones: torch.Tensor,
+        gamma: float,
+        proj_dist: torch.Tensor,
+    ) -> torch.Tensor:
+        """Projects the target distribution onto the support, falling back to eager
+        execution if the compiled projection cannot be traced. The projection isn't
+        compiled separately when the whole update is captured in a CUDA graph.
+
+        :param target_q_dist: Target distribution for the greedy next actions
+        :type target_q_dist: torch.Tensor
+        :param rewards: Batch of rewards received
+        :type rewards: torch.Tensor
+        :param dones: Batch of done flags indicating episode termination
+        :type dones: torch.Tensor
+        :param gamma: Discount factor
+        :type gamma: float
+        :param proj_dist: Buffer the projected distribution is written into
+        :type proj_dist: torch.Tensor
+        :return: Projected target distribution
+        :rtype: torch.Tensor
+        """
+        args = (
+            target_q_dist,
+            rewards,
+            dones,
+            self.support,
+            self.v_min,
+            self.v_max,
+            self.delta_z,
+            self.num_atoms,
+            gamma,
+            proj_dist,
+        )
+        if self._compiled_projection is _project_distribution:
+            return _project_distribution(*args)
+
+        try:
+            return self._compiled_projection(*args)
+        except torch._dynamo.exc.TorchDynamoException as e:
+            warnings.warn(
+                f"Compiling the distribution projection failed, falling back to eager mode: {e}"
+            )
+            self._compiled_projection = _project_distribution
+            return self._compiled_projection(*args)
+
+    def update(
+        self,
+        obs: TorchObsType,
+        actions: torch.Tensor,
+        rewards: torch.Tensor,
+        next_obs: TorchObsType,
+        dones: torch.Tensor,
+        weights: Optional[torch.Tensor] = None,
+        n_obs: Optional[TorchObsType] = None,
+        n_actions: Optional[torch.Tensor] = None,
+        n_rewards: Optional[torch.Tensor] = None,
+        n_next_obs: Optional[TorchObsType] = None,
+        n_dones: Optional[torch.Tensor] = None,
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Updates the actor network parameters from a batch of experiences.
+
+        :param obs: Batch of current states
+        :type obs: torch.Tensor[float], dict[str, torch.Tensor[float]], tuple[torch.Tensor[float]]
+        :param actions: Batch of actions taken
+        :type actions: torch.Tensor[int]
+        :param rewards: Batch of rewards received
+        :type rewards: torch.Tensor[float]
+        :param next_obs: Batch of next states
+        :type next_obs: torch.Tensor[float], dict[str, torch.Tensor[float]], tuple[torch.Tensor[float]]
+        :param dones: Batch of done flags
+        :type dones: torch.Tensor[int]
+        :param weights: Importance sampling weights of a prioritized replay buffer, defaults to None
+        :type weights: torch.Tensor[float], optional
+        :param n_obs: Batch of current states of n-step transitions, defaults to None
+        :type n_obs: torch.Tensor[float], dict[str, torch.Tensor[float]], tuple[torch.Tensor[float]], optional
+        :param n_actions: Batch of actions of n-step transitions, defaults to None
+        :type n_actions: torch.Tensor[int], optional
+        :param n_rewards: Batch of n-step rewards, defaults to None
+        :type n_rewards: torch.Tensor[float], optional
+        :param n_next_obs: Batch of next states of n-step transitions, defaults to None
+        :type n_next_obs: torch.Tensor[float], dict[str, torch.Tensor[float]], tuple[torch.Tensor[float]], optional
+        :param n_dones: Batch of done flags of n-step transitions, defaults to None
+        :type n_dones: torch.Tensor[int], optional
+
+        :return: Loss and element-wise loss
+        :rtype: Tuple[torch.Tensor, torch.Tensor]
+        """
+        n_step = n_obs is not None
+        if self.combined_reward or not n_step:
+            elementwise_loss = self._dqn_loss(
+                obs, actions, rewards, next_obs, dones, self.gamma
+            )
+
+        if n_step:
+            n_gamma = self.gamma**self.n_step
+            n_step_elementwise_loss = self._dqn_loss(
+                n_obs,
+                n_actions,
+                n_rewards,
+                n_next_obs,
+                n_dones,
+                n_gamma,
+                n_step=True,
+            )
+            if self.combined_reward:
+                elementwise_loss += n_step_elementwise_loss
+            else:
+                elementwise_loss = n_step_elementwise_loss
+
+        if weights is not None:
+            loss = torch.mean(elementwise_loss * weights)
+        else:
+            loss = torch.mean(elementwise_loss)
+
+        self.optimizer.zero_grad(set_to_none=True)
+        if self.accelerator is not None:
+            self.accelerator.backward(loss)
+        else:
+            loss.backward()
+
+        if self.accelerator is not None:
+            self.accelerator.clip_grad_norm_(self.actor.parameters(), 10.0)
+        else:
+            clip_grad_norm_(self.actor.parameters(), 10.0)
+
+        self.optimizer.step()
+
+        return loss.detach(), elementwise_loss.detach()
+
     def learn(
         self, experiences: ExperiencesType, n_step: bool = False, per: bool = False
-    ) -> Tuple[float, Optional[ArrayLike], Optional[ArrayLike]]:
-        """Updates agent network parameters to learn from experiences.
+    ) -> Tuple[torch.Tensor, Optional[ArrayLike], Optional[torch.Tensor]]:
+        """Updates agent network parameters to learn from experiences. The loss and new
+        priorities are returned as tensors on the learner device, so that learning doesn't
+        synchronise with the device on every step. Call ``.item()`` on the loss only when
+        its value is needed, e.g. for logging.
 
         :param experiences: List of batched states, actions, rewards, next_states, dones in that order.
         :type obs: list[torch.Tensor[float]]
@@ -366,124 +810,66 @@ class RainbowDQN(RLAlgorithm):
         :type per: bool, optional
 
         :return: Tuple of loss, indices, and new priorities
-        :rtype: Tuple[float, numpy.ndarray, numpy.ndarray]
+        :rtype: Tuple[torch.Tensor, numpy.ndarray, torch.Tensor]
         """
         experiences = self.to_device(*experiences)
-        if per:
-            if n_step:
-                (
-                    states,
-                    actions,
-                    rewards,
-                    next_states,
-                    dones,
-                    weights,
-                    idxs,
-                    n_states,
-                    n_actions,
-                    n_rewards,
-                    n_next_states,
-                    n_dones,
-                ) = experiences
-            else:
-                (
-                    states,
-                    actions,
-                    rewards,
-                    next_states,
-                    dones,
-                    weights,
-                    idxs,
-                ) = experiences
-
-            if self.combined_reward or not n_step:
-                elementwise_loss = self._dqn_loss(
-                    states, actions, rewards, next_states, dones, self.gamma
-                )
-            if n_step:
-                n_gamma = self.gamma**self.n_step
-                n_step_elementwise_loss = self._dqn_loss(
-                    n_states, n_actions, n_rewards, n_next_states, n_dones, n_gamma
-                )
-                if self.combined_reward:
-                    elementwise_loss += n_step_elementwise_loss
-                else:
-                    elementwise_loss = n_step_elementwise_loss
-            loss = torch.mean(elementwise_loss * weights)
+        states, actions, rewards, next_states, dones = experiences[:5]
 
+        weights = None
+        if per:
+            weights, idxs = experiences[5:7]
+        elif n_step:
+            idxs = experiences[5]
         else:
-            if n_step:
-                (
-                    states,
-                    actions,
-                    rewards,
-                    next_states,
-                    dones,
-                    idxs,
-                    n_states,
-                    n_actions,
-                    n_rewards,
-                    n_next_states,
-                    n_dones,
-                ) = experiences
-            else:
-                (
-                    states,
-                    actions,
-                    rewards,
-                    next_states,
-                    dones,
-                ) = experiences
-
-            if not n_step:
-                idxs = None
-
-            new_priorities = None
-
-            if self.combined_reward or not n_step:
-                elementwise_loss = self._dqn_loss(
-                    states, actions, rewards, next_states, dones, self.gamma
-                )
+            idxs = None
+
+        # Observations are preprocessed once per batch outside of the update step, and
+        # only for the transitions that contribute to the loss
+        if self.combined_reward or not n_step:
+            states = self.preprocess_observation(states)
+            next_states = self.preprocess_observation(next_states)
+
+        n_step_experiences = ()
+        if n_step:
+            n_states, n_actions, n_rewards, n_next_states, n_dones = experiences[-5:]
+            n_step_experiences = (
+                self.preprocess_observation(n_states),
+                n_actions,
+                n_rewards,
+                self.preprocess_observation(n_next_states),
+                n_dones,
+            )
 
-            if n_step:
-                n_gamma = self.gamma**self.n_step
-                n_step_elementwise_loss = self._dqn_loss(
-                    n_states, n_actions, n_rewards, n_next_states, n_dones, n_gamma
-                )
-                if self.combined_reward:
-                    elementwise_loss += n_step_elementwise_loss
-                else:
-                    elementwise_loss = n_step_elementwise_loss
-            loss = torch.mean(elementwise_loss)
+        # Rebuild the batch buffers (and recapture the update) if the batch size was changed
+        if self._batch_idxs.size(0) != self.batch_size:
+            self.init_batch_buffers()
+            self.init_update_fn()
 
-        self.optimizer.zero_grad()
-        if self.accelerator is not None:
-            self.accelerator.backward(loss)
-        else:
-            loss.backward()
-
-        clip_grad_norm_(self.actor.parameters(), 10.0)
-        self.optimizer.step()
+        loss, elementwise_loss = self._update_fn(
+            states, actions, rewards, next_states, dones, weights, *n_step_experiences
+        )
 
         # soft update target network
         self.soft_update()
         self.actor.reset_noise()
         self.actor_target.reset_noise()
 
+        # The quantized actor is only re-quantized when next used to select actions
+        self._quantized_actor_stale = True
+
+        new_priorities = None
         if per:
-            loss_for_prior = elementwise_loss.detach().cpu().numpy()
-            new_priorities = loss_for_prior + self.prior_eps
+            # Priorities are left on the device, the replay buffer copies them asynchronously
+            new_priorities = elementwise_loss + self.prior_eps
 
-        return loss.item(), idxs, new_priorities
+        return loss, idxs, new_priorities
 
     def soft_update(self) -> None:
         """Soft updates target network."""
-        for eval_param, target_param in zip(
-            self.actor.parameters(), self.actor_target.parameters()
-        ):
-            target_param.data.copy_(
-                self.tau * eval_param.data + (1.0 - self.tau) * target_param.data
-            )
+        # Update all parameters with multi-tensor kernels rather than one per parameter
+        with torch.no_grad():
+            torch._foreach_mul_(self._target_params, 1.0 - self.tau)
+            torch._foreach_add_(self._target_params, self._actor_params, alpha=self.tau)
 
     def test(
         self,
@@ -504,33 +890,40 @@ class RainbowDQN(RLAlgorithm):
         :type loop: int, optional
         """
         self.set_training_mode(False)
-        with torch.no_grad():
+        actor = self._inference_actor()
+        actor.train(mode=False)
+        with torch.inference_mode():
             rewards = []
             num_envs = env.num_envs if hasattr(env, "num_envs") else 1
             for _ in range(loop):
                 obs, info = env.reset()
                 scores = np.zeros(num_envs)
                 completed_episode_scores = np.zeros(num_envs)
-                finished = np.zeros(num_envs)
+                finished = np.zeros(num_envs, dtype=bool)
                 step = 0
                 while not np.all(finished):
                     if swap_channels:
                         obs = obs_channels_to_first(obs)
 
+                    # Single batched forward pass over all of the vectorized environments
                     action_mask = info.get("action_mask", None)
-                    action = self.get_action(
-                        obs, training=False, action_mask=action_mask
-                    )
+                    torch_obs = self.preprocess_observation(obs)
+                    action = self._get_action(torch_obs, action_mask).cpu().numpy()
                     obs, reward, done, trunc, info = env.step(action)
                     step += 1
                     scores += np.array(reward)
-                    for idx, (d, t) in enumerate(zip(done, trunc)):
-                        if (
-                            d or t or (max_steps is not None and step == max_steps)
-                        ) and not finished[idx]:
-                            completed_episode_scores[idx] = scores[idx]
-                            finished[idx] = 1
+
+                    # Record the scores of episodes that have just finished
+                    ended = np.atleast_1d(np.logical_or(done, trunc))
+                    if max_steps is not None and step == max_steps:
+                        ended[:] = True
+
+                    newly_finished = ended & ~finished
+                    completed_episode_scores[newly_finished] = scores[newly_finished]
+                    finished |= newly_finished
                 rewards.append(np.mean(completed_episode_scores))
+
+        actor.train()
         mean_fit = np.mean(rewards)
         self.fitness.append(mean_fit)
         return mean_fit
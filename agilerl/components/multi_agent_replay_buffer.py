@@ -1,7 +1,9 @@
-import random
-from collections import deque, namedtuple
+import queue
+import threading
+import weakref
+from collections import namedtuple
 from numbers import Number
-from typing import Any, Deque, Dict, List, NamedTuple, Optional, Tuple, Union
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
 
 import numpy as np
 import torch
@@ -16,7 +18,8 @@ TorchTransitionType = Union[torch.Tensor, Dict[str, torch.Tensor]]
 
 class MultiAgentReplayBuffer:
     """The Multi-Agent Experience Replay Buffer class. Used to store multiple agents'
-    experiences and allow off-policy learning.
+    experiences and allow off-policy learning. Experiences are stored in a preallocated
+    list used as a ring buffer, so that sampled experiences are looked up in constant time.
 
     :param memory_size: Maximum length of the replay buffer
     :type memory_size: int
@@ -40,15 +43,33 @@ class MultiAgentReplayBuffer:
         assert len(agent_ids) > 0, "Agent ids must contain at least one agent id."
 
         self.memory_size: int = memory_size
-        self.memory: Deque = deque(maxlen=memory_size)
+        self.memory: List[Optional[NamedTuple]] = [None] * memory_size
         self.field_names: List[str] = field_names
         self.experience: NamedTuple = namedtuple(
             "Experience", field_names=self.field_names
         )
         self.counter: int = 0
+        self.write_idx: int = 0  # index the next experience is written at
+        self.size: int = 0  # number of experiences stored
         self.device: Optional[str] = device
         self.agent_ids: List[str] = agent_ids
 
+        # Generator used to sample experiences, seeded from the global numpy random state so
+        # that seeding numpy still makes sampling reproducible
+        self._rng = np.random.default_rng(np.random.randint(2**32, dtype=np.uint64))
+
+        # Lock held while memory is read or updated, since experiences can be saved by a
+        # background thread
+        self._lock = threading.RLock()
+
+        # Experiences added with async_add are saved to memory by a background writer thread,
+        # which only holds a weak reference to the buffer and is stopped by close, or once
+        # the buffer is garbage collected
+        self._write_queue: Optional[queue.Queue] = None
+        self._write_thread: Optional[threading.Thread] = None
+        self._write_finalizer: Optional[weakref.finalize] = None
+        self._write_error: Optional[BaseException] = None
+
     def __len__(self) -> int:
         """
         Returns the current size of internal memory.
@@ -56,7 +77,7 @@ class MultiAgentReplayBuffer:
         :return: Length of the memory
         :rtype: int
         """
-        return len(self.memory)
+        return self.size
 
     @staticmethod
     def stack_transitions(transitions: List[NumpyObsType]) -> NumpyObsType:
@@ -110,7 +131,9 @@ class MultiAgentReplayBuffer:
         :type args: Any
         """
         e = self.experience(*args)
-        self.memory.append(e)
+        self.memory[self.write_idx] = e
+        self.write_idx = (self.write_idx + 1) % self.memory_size
+        self.size = min(self.size + 1, self.memory_size)
 
     def _process_transition(
         self, experiences: List[NamedTuple], np_array: bool = False
@@ -126,7 +149,6 @@ class MultiAgentReplayBuffer:
         :rtype: Dict[str, Dict[str, Any]]
         """
         transition = {field: {} for field in self.field_names}
-        experiences_filtered = [e for e in experiences if e is not None]
 
         for field in self.field_names:
             is_binary_field = field in [
@@ -139,7 +161,7 @@ class MultiAgentReplayBuffer:
 
             for agent_id in self.agent_ids:
                 # Get field values for each agent
-                ts = [getattr(e, field)[agent_id] for e in experiences_filtered]
+                ts = [getattr(e, field)[agent_id] for e in experiences]
 
                 # Stack transitions if necessary
                 ts = MultiAgentReplayBuffer.stack_transitions(ts)
@@ -165,7 +187,10 @@ class MultiAgentReplayBuffer:
         :return: Sampled experiences
         :rtype: Tuple
         """
-        experiences = random.sample(self.memory, k=batch_size)
+        with self._lock:
+            idxs = self._rng.integers(0, self.size, size=batch_size)
+            experiences = [self.memory[i] for i in idxs]
+
         transition = self._process_transition(experiences)
         return tuple(transition.values())
 
@@ -177,8 +202,9 @@ class MultiAgentReplayBuffer:
             e.g. state, action, reward, next_state, done
         :type args: Any
         """
-        self._add(*args)
-        self.counter += 1
+        with self._lock:
+            self._add(*args)
+            self.counter += 1
 
     def _reorganize_dicts(
         self, *args: Dict[str, NumpyObsType]
@@ -223,9 +249,10 @@ class MultiAgentReplayBuffer:
         :type args: Any
         """
         args = self._reorganize_dicts(*args)
-        for transition in zip(*args):
-            self._add(*transition)
-            self.counter += 1
+        with self._lock:
+            for transition in zip(*args):
+                self._add(*transition)
+                self.counter += 1
 
     def save_to_memory(
         self, *args: Dict[str, NumpyObsType], is_vectorised: bool = False
@@ -244,3 +271,94 @@ class MultiAgentReplayBuffer:
             self.save_to_memory_vect_envs(*args)
         else:
             self.save_to_memory_single_env(*args)
+
+    def async_add(
+        self, *args: Dict[str, NumpyObsType], is_vectorised: bool = False
+    ) -> None:
+        """
+        Queues experiences to be saved to memory by a background writer thread, so that
+        saving them is overlapped with stepping the environment. Experiences are saved in
+        the order they are queued, and the arrays passed mustn't be modified afterwards.
+        Use ``flush`` to wait until all queued experiences have been saved.
+
+        :param args: Variable length argument list. Contains batched or unbatched transition elements in consistent order,
+            e.g. states, actions, rewards, next_states, dones
+        :type args: Any
+        :param is_vectorised: Boolean flag indicating if the environment has been vectorized
+        :type is_vectorised: bool
+        """
+        self._raise_write_error()
+        if self._write_queue is None:
+            self._write_queue = queue.Queue()
+            self._write_thread = threading.Thread(
+                target=self._write_worker,
+                args=(weakref.ref(self), self._write_queue),
+                name="replay_writer",
+                daemon=True,
+            )
+            self._write_thread.start()
+            self._write_finalizer = weakref.finalize(self, self._write_queue.put, None)
+
+        self._write_queue.put((args, is_vectorised))
+
+    def flush(self) -> None:
+        """
+        Blocks until all experiences queued with ``async_add`` have been saved to memory.
+        """
+        if self._write_queue is not None:
+            self._write_queue.join()
+
+        self._raise_write_error()
+
+    def close(self) -> None:
+        """
+        Saves the experiences queued with ``async_add`` to memory, then stops the
+        background writer thread. Experiences can still be added afterwards, which
+        restarts the thread if needed.
+        """
+        if self._write_queue is not None:
+            self._write_finalizer()
+            self._write_thread.join()
+            self._write_queue = None
+            self._write_thread = None
+            self._write_finalizer = None
+
+        self._raise_write_error()
+
+    @staticmethod
+    def _write_worker(
+        buffer_ref: "weakref.ref[MultiAgentReplayBuffer]", write_queue: queue.Queue
+    ) -> None:
+        """
+        Saves the experiences queued with ``async_add`` to memory, until ``None`` is
+        queued or the buffer has been garbage collected.
+
+        :param buffer_ref: Weak reference to the buffer
+        :type buffer_ref: weakref.ref[MultiAgentReplayBuffer]
+        :param write_queue: Queue of experiences to save
+        :type write_queue: queue.Queue
+        """
+        while True:
+            item = write_queue.get()
+            buffer = buffer_ref() if item is not None else None
+            try:
+                if buffer is None:
+                    return
+
+                args, is_vectorised = item
+                with buffer._lock:
+                    buffer.save_to_memory(*args, is_vectorised=is_vectorised)
+            except BaseException as e:
+                buffer._write_error = e
+            finally:
+                # Doesn't keep the buffer alive while waiting for the next experiences
+                buffer = None
+                write_queue.task_done()
+
+    def _raise_write_error(self) -> None:
+        """
+        Raises the error the background writer thread failed with, if any.
+        """
+        if self._write_error is not None:
+            error, self._write_error = self._write_error, None
+            raise error
@@ -1,7 +1,22 @@
-import random
+import queue
+import threading
+import warnings
+import weakref
 from collections import deque, namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
 from numbers import Number
-from typing import Any, Deque, Dict, List, NamedTuple, Optional, Tuple, Union
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
 import numpy as np
 import torch
@@ -14,67 +29,371 @@ from agilerl.utils.algo_utils import obs_to_tensor
 NpTransitionType = Union[Number, ArrayLike, Dict[str, ArrayLike]]
 TorchTransitionType = Union[torch.Tensor, Dict[str, torch.Tensor]]
 
+# Alignment in bytes of the fields packed into a single staging buffer, so that each can be
+# viewed with its own dtype on the device
+_PACKED_ALIGNMENT = 64
+
+# Fields flagging the end of an episode, which are cast to integers when sampled
+_DONE_FIELDS = ("done", "termination", "terminated", "truncation", "truncated")
+
+# Fields always stored as float32, whatever the dtype of the first transition element
+_FLOAT_FIELDS = ("reward", *_DONE_FIELDS)
+
+
+def _allocate_storage(
+    value: NpTransitionType,
+    memory_size: int,
+    image_dtype: Optional[np.dtype] = None,
+    dtype: Optional[np.dtype] = None,
+) -> NumpyObsType:
+    """Allocates a contiguous array (or dictionary/tuple of arrays) able to hold
+    ``memory_size`` transition elements with the same structure as ``value``. Scalars
+    are stored with a trailing dimension of one. Elements are stored in their native
+    dtype, except for double precision values and python numbers which are stored as
+    float32 since sampled batches are returned as float32 tensors.
+
+    :param value: Example transition element
+    :type value: Number, ArrayLike, dict[str, ArrayLike], tuple[ArrayLike, ...]
+    :param memory_size: Number of transition elements to allocate space for
+    :type memory_size: int
+    :param image_dtype: Data type to store elements with two or more dimensions (i.e. images)
+        as, defaults to None
+    :type image_dtype: numpy.dtype, optional
+    :param dtype: Data type to store all elements as, defaults to None
+    :type dtype: numpy.dtype, optional
+    :return: Preallocated storage
+    :rtype: NumpyObsType
+    """
+    if isinstance(value, dict):
+        return {
+            k: _allocate_storage(v, memory_size, image_dtype, dtype)
+            for k, v in value.items()
+        }
+    elif isinstance(value, tuple):
+        return tuple(
+            _allocate_storage(v, memory_size, image_dtype, dtype) for v in value
+        )
+
+    shape = np.shape(value) or (1,)
+    if dtype is not None:
+        return np.empty((memory_size, *shape), dtype=dtype)
+
+    # The type of python numbers is not reliable (e.g. an integer reward followed by float ones)
+    if isinstance(value, Number) and not isinstance(value, np.generic):
+        dtype = np.float32
+    else:
+        dtype = np.asarray(value).dtype
+        if dtype == np.float64:
+            dtype = np.float32
+
+    if image_dtype is not None and len(shape) >= 2:
+        dtype = image_dtype
+
+    return np.empty((memory_size, *shape), dtype=dtype)
+
+
+def _write_storage(storage: NumpyObsType, idx: int, value: NpTransitionType) -> None:
+    """Writes a transition element into the storage at the given index.
+
+    :param storage: Preallocated storage
+    :type storage: NumpyObsType
+    :param idx: Index to write the transition element at
+    :type idx: int
+    :param value: Transition element
+    :type value: Number, ArrayLike, dict[str, ArrayLike], tuple[ArrayLike, ...]
+    """
+    if isinstance(storage, dict):
+        for k, v in value.items():
+            _write_storage(storage[k], idx, v)
+    elif isinstance(storage, tuple):
+        for sub_storage, v in zip(storage, value):
+            _write_storage(sub_storage, idx, v)
+    else:
+        storage[idx] = value
+
+
+def _write_storage_batch(
+    storage: NumpyObsType, idxs: ArrayLike, values: NpTransitionType
+) -> None:
+    """Writes a batch of transition elements into the storage at the given indices.
+
+    :param storage: Preallocated storage
+    :type storage: NumpyObsType
+    :param idxs: Indices to write the transition elements at
+    :type idxs: ArrayLike
+    :param values: Batch of transition elements
+    :type values: ArrayLike, dict[str, ArrayLike], tuple[ArrayLike, ...]
+    """
+    if isinstance(storage, dict):
+        for k, v in values.items():
+            _write_storage_batch(storage[k], idxs, v)
+    elif isinstance(storage, tuple):
+        for sub_storage, v in zip(storage, values):
+            _write_storage_batch(sub_storage, idxs, v)
+    else:
+        storage[idxs] = np.reshape(values, (len(idxs), *storage.shape[1:]))
+
+
+def _batch_item(values: NpTransitionType, idx: int) -> NpTransitionType:
+    """Returns a single transition element from a batch of transition elements.
+
+    :param values: Batch of transition elements
+    :type values: ArrayLike, dict[str, ArrayLike], tuple[ArrayLike, ...]
+    :param idx: Index of the transition element in the batch
+    :type idx: int
+    :return: Transition element
+    :rtype: Number, ArrayLike, dict[str, ArrayLike], tuple[ArrayLike, ...]
+    """
+    if isinstance(values, dict):
+        return {k: _batch_item(v, idx) for k, v in values.items()}
+    elif isinstance(values, tuple):
+        return tuple(_batch_item(v, idx) for v in values)
+
+    return values[idx]
+
+
+def _batch_len(values: NpTransitionType) -> int:
+    """Returns the number of transition elements in a batch.
+
+    :param values: Batch of transition elements
+    :type values: ArrayLike, dict[str, ArrayLike], tuple[ArrayLike, ...]
+    :return: Number of transition elements
+    :rtype: int
+    """
+    if isinstance(values, dict):
+        return _batch_len(next(iter(values.values())))
+    elif isinstance(values, tuple):
+        return _batch_len(values[0])
+
+    return len(values)
+
+
+def _read_storage(storage: NumpyObsType, idxs: ArrayLike) -> NumpyObsType:
+    """Gathers the transition elements at the given indices from the storage.
+
+    :param storage: Preallocated storage
+    :type storage: NumpyObsType
+    :param idxs: Indices to gather
+    :type idxs: ArrayLike
+    :return: Batch of transition elements
+    :rtype: NumpyObsType
+    """
+    if isinstance(storage, dict):
+        return {k: v[idxs] for k, v in storage.items()}
+    elif isinstance(storage, tuple):
+        return tuple(v[idxs] for v in storage)
+
+    return storage[idxs]
+
+
+def _flatten_fields(
+    key: str, value: NumpyObsType, leaves: Dict[str, np.ndarray]
+) -> None:
+    """Adds the arrays of a (possibly nested) field to a flat dictionary, named by their
+    path in the field, e.g. 'state.image' or 'state.0'.
+
+    :param key: Name of the field
+    :type key: str
+    :param value: Field
+    :type value: numpy.ndarray, dict[str, numpy.ndarray], tuple[numpy.ndarray, ...]
+    :param leaves: Flat dictionary of arrays
+    :type leaves: dict[str, numpy.ndarray]
+    """
+    if isinstance(value, dict):
+        for k, v in value.items():
+            _flatten_fields(f"{key}.{k}", v, leaves)
+    elif isinstance(value, tuple):
+        for i, v in enumerate(value):
+            _flatten_fields(f"{key}.{i}", v, leaves)
+    else:
+        leaves[key] = value
+
+
+def _nest_fields(
+    key: str, value: NumpyObsType, tensors: Dict[str, torch.Tensor]
+) -> TorchTransitionType:
+    """Rebuilds a (possibly nested) field from a flat dictionary of tensors named by
+    their path in the field, following the structure of ``value``.
+
+    :param key: Name of the field
+    :type key: str
+    :param value: Field with the structure to rebuild
+    :type value: numpy.ndarray, dict[str, numpy.ndarray], tuple[numpy.ndarray, ...]
+    :param tensors: Flat dictionary of tensors
+    :type tensors: dict[str, torch.Tensor]
+    :return: Field as tensors
+    :rtype: torch.Tensor, dict[str, torch.Tensor], tuple[torch.Tensor, ...]
+    """
+    if isinstance(value, dict):
+        return {k: _nest_fields(f"{key}.{k}", v, tensors) for k, v in value.items()}
+    elif isinstance(value, tuple):
+        return tuple(
+            _nest_fields(f"{key}.{i}", v, tensors) for i, v in enumerate(value)
+        )
+
+    return tensors[key]
+
+
+def _stack_transitions(transitions: List[NumpyObsType]) -> NumpyObsType:
+    """Stacks transitions into a single array/dictionary/tuple of arrays.
+
+    :param transitions: List of transitions
+    :type transitions: list[NumpyObsType]
+    :return: Stacked transitions
+    :rtype: NumpyObsType
+    """
+    # Identify the type of the transition
+    field_type = type(transitions[0])
+
+    # Stack the transitions into a single array or tuple/dictionary of arrays
+    ts = []
+    for ft in transitions:
+        if field_type is dict:
+            ts.append({k: np.expand_dims(v, axis=0) for k, v in ft.items()})
+        elif field_type is tuple:
+            ts.append(tuple(np.expand_dims(v, axis=0) for v in ft))
+        else:
+            ts.append(np.expand_dims(ft, axis=0))
+
+    if field_type is dict:
+        ts = {k: np.vstack([t[k] for t in ts]) for k in ts[0].keys()}
+    elif field_type is tuple:
+        ts = tuple(np.vstack([t[i] for t in ts]) for i in range(len(ts[0])))
+    else:
+        ts = np.vstack(ts)
+
+    return ts
+
 
 class ReplayBuffer:
     """The Experience Replay Buffer class. Used to store experiences and allow
-    off-policy learning.
+    off-policy learning. Experiences are stored in a ring buffer of preallocated
+    arrays, one per field, which are allocated when the first experience is added.
+    Batches sampled onto a CUDA device are copied into reusable device buffers, and
+    so are only valid until the next batch is sampled.
 
     :param memory_size: Maximum length of replay buffer
     :type memory_size: int
-    :param field_names: Field names for experience named tuple, e.g. ['state', 'action', 'reward']
+    :param field_names: Field names of the experiences, e.g. ['state', 'action', 'reward']
     :type field_names: list[str]
     :param device: Device for accelerated computing, 'cpu' or 'cuda', defaults to None
     :type device: str, optional
+    :param state_dtype: Data type to store image observations in the 'state' and 'next_state'
+        fields as, e.g. np.uint8 for pixel values in [0, 255], which are cast to float after
+        being transferred to the device. Defaults to None, storing them in their native dtype
+    :type state_dtype: numpy.dtype, optional
     """
 
     def __init__(
-        self, memory_size: int, field_names: List[str], device: Optional[str] = None
+        self,
+        memory_size: int,
+        field_names: List[str],
+        device: Optional[str] = None,
+        state_dtype: Optional[np.dtype] = None,
     ):
         assert memory_size > 0, "Memory size must be greater than zero."
         assert len(field_names) > 0, "Field names must contain at least one field name."
 
         self.memory_size = memory_size
-        self.memory = deque(maxlen=memory_size)
+        self.memory: Dict[str, NumpyObsType] = {}
         self.field_names = field_names
-        self.experience = namedtuple("Experience", field_names=self.field_names)
         self.counter = 0  # update cycle counter
+        self.write_idx = 0  # index the next experience is written at
+        self.size = 0  # number of experiences stored
         self.device = device
+        self.state_dtype = state_dtype
+
+        # Generator used to sample experiences, seeded from the global numpy random state so
+        # that seeding numpy still makes sampling reproducible
+        self._rng = np.random.default_rng(np.random.randint(2**32, dtype=np.uint64))
+
+        # Reusable pinned host buffers that sampled batches are staged in before being
+        # copied asynchronously to a CUDA device, with events marking the end of each copy
+        self._pinned_staging: Dict[
+            Tuple[Tuple[str, int], str], Tuple[torch.Tensor, torch.cuda.Event]
+        ] = {}
+        self._pin_memory = device is not None and torch.device(device).type == "cuda"
+
+        # Reusable device buffers the staged batches are copied into. NOTE: A batch sampled
+        # onto a CUDA device is therefore only valid until the next batch is sampled
+        self._device_buffers: Dict[Tuple[Tuple[str, int], str], torch.Tensor] = {}
+
+        # Consecutive batches of each kind (sampled, or gathered from given indices) alternate
+        # between two sets of staging and device buffers, so that a batch can be prefetched
+        # while the previous one, and any batch gathered from its indices, is still in use
+        self._slot: Tuple[str, int] = ("sample", 0)
+        self._slot_parity: Dict[str, int] = {}
+        self._prefetch_executor: Optional[ThreadPoolExecutor] = None
+        self._prefetched: Optional[Tuple[Tuple[Any, ...], Future]] = None
+
+        # Lock held while memory, the slots or the priority trees are read or updated, since
+        # batches can be prefetched and experiences saved by background threads
+        self._lock = threading.RLock()
+
+        # Experiences added with async_add are saved to memory by a background writer thread,
+        # which only holds a weak reference to the buffer and is stopped by close, or once
+        # the buffer is garbage collected
+        self._write_queue: Optional[queue.Queue] = None
+        self._write_thread: Optional[threading.Thread] = None
+        self._write_finalizer: Optional[weakref.finalize] = None
+        self._write_error: Optional[BaseException] = None
 
     def __len__(self) -> int:
         """Returns the current size of internal memory."""
-        return len(self.memory)
+        return self.size
+
+    @property
+    def experience(self) -> Type[NamedTuple]:
+        """Named tuple type of a single experience.
+
+        .. deprecated::
+            Experiences are stored as a dictionary of preallocated arrays, so aren't
+            built as named tuples.
+        """
+        warnings.warn(
+            "ReplayBuffer.experience is deprecated, since experiences are stored as a "
+            "dictionary of preallocated arrays.",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        return namedtuple("Experience", field_names=self.field_names)
 
     @staticmethod
     def stack_transitions(transitions: List[NumpyObsType]) -> NumpyObsType:
         """Stacks transitions into a single array/dictionary/tuple of arrays.
 
+        .. deprecated::
+            Sampled transitions are read from memory with a single gather per field.
+
         :param transitions: List of transitions
         :type transitions: list[NumpyObsType]
 
         :return: Stacked transitions
         :rtype: NumpyObsType
         """
-        # Identify the type of the transition
-        field_type = type(transitions[0])
-
-        # Stack the transitions into a single array or tuple/dictionary of arrays
-        ts = []
-        for ft in transitions:
-            if field_type is dict:
-                ts.append({k: np.expand_dims(v, axis=0) for k, v in ft.items()})
-            elif field_type is tuple:
-                ts.append(tuple(np.expand_dims(v, axis=0) for v in ft))
-            else:
-                ts.append(np.expand_dims(ft, axis=0))
-
-        if field_type is dict:
-            ts = {k: np.vstack([t[k] for t in ts]) for k in ts[0].keys()}
-        elif field_type is tuple:
-            ts = tuple(np.vstack([t[i] for t in ts]) for i in range(len(ts[0])))
-        else:
-            ts = np.vstack(ts)
-
-        return ts
+        warnings.warn(
+            "ReplayBuffer.stack_transitions is deprecated, since sampled transitions are "
+            "read from memory with a single gather per field.",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        return _stack_transitions(transitions)
+
+    def _allocate_field(self, field: str, value: NpTransitionType) -> NumpyObsType:
+        """Allocates the storage of a field, with rewards and done flags stored as float32
+        so that e.g. an integer first reward doesn't truncate later ones, and image
+        observations stored as ``state_dtype`` if specified.
+
+        :param field: Name of the field
+        :type field: str
+        :param value: Example transition element of the field
+        :type value: Number, ArrayLike, dict[str, ArrayLike], tuple[ArrayLike, ...]
+        :return: Preallocated storage
+        :rtype: NumpyObsType
+        """
+        image_dtype = self.state_dtype if field in ["state", "next_state"] else None
+        dtype = np.float32 if field in _FLOAT_FIELDS else None
+        return _allocate_storage(value, self.memory_size, image_dtype, dtype)
 
     def _add(self, *args: Any) -> None:
         """Adds experience to memory.
@@ -82,14 +401,74 @@ class ReplayBuffer:
         :param *args: Variable length argument list. Contains transition elements in consistent order,
             e.g. state, action, reward, next_state, done
         """
-        e = self.experience(*args)
-        self.memory.append(e)
+        with self._lock:
+            if not self.memory:
+                self.memory = {
+                    field: self._allocate_field(field, value)
+                    for field, value in zip(self.field_names, args)
+                }
+
+            for field, value in zip(self.field_names, args):
+                _write_storage(self.memory[field], self.write_idx, value)
+
+            self.write_idx = (self.write_idx + 1) % self.memory_size
+            self.size = min(self.size + 1, self.memory_size)
+
+    def _add_batch(self, *args: Any) -> None:
+        """Adds a batch of experiences to memory with a single write per field.
+
+        :param *args: Variable length argument list. Contains batched transition elements in consistent order,
+            e.g. states, actions, rewards, next_states, dones
+        """
+        with self._lock:
+            if not self.memory:
+                self.memory = {
+                    field: self._allocate_field(field, _batch_item(values, 0))
+                    for field, values in zip(self.field_names, args)
+                }
+
+            n = _batch_len(args[0])
+            idxs = (self.write_idx + np.arange(n)) % self.memory_size
+            for field, values in zip(self.field_names, args):
+                _write_storage_batch(self.memory[field], idxs, values)
+
+            self.write_idx = (self.write_idx + n) % self.memory_size
+            self.size = min(self.size + n, self.memory_size)
+
+    def _finalize_transition(
+        self, transition: Dict[str, NumpyObsType], np_array: bool = False
+    ) -> Dict[str, Any]:
+        """Casts the done fields of a stacked transition to integers and converts the
+        fields to torch tensors if specified.
+
+        :param transition: Transition dictionary of stacked fields
+        :type transition: dict
+        :param np_array: Flag to return numpy arrays instead of torch tensors, defaults to False
+        :type np_array: bool, optional
+        :return: Transition dictionary
+        :rtype: dict
+        """
+        for field, ts in transition.items():
+            # Handle integer fields
+            if field in _DONE_FIELDS:
+                ts = ts.astype(np.uint8)
+
+            # Convert to torch tensor if specified
+            if not np_array:
+                ts = self._to_tensor(field, ts)
+
+            transition[field] = ts
+
+        return transition
 
     def _process_transition(
         self, experiences: List[NamedTuple], np_array: bool = False
     ) -> Dict[str, Any]:
         """Returns transition dictionary from experiences.
 
+        .. deprecated::
+            Sampled transitions are read from memory with a single gather per field.
+
         :param experiences: List of experiences
         :type experiences: list
         :param np_array: Flag to return numpy arrays instead of torch tensors, defaults to False
@@ -97,39 +476,277 @@ class ReplayBuffer:
         :return: Transition dictionary
         :rtype: dict
         """
-        transition = {}
-        for field in self.field_names:
-            # Extract all of the transitions for the current field
-            field_transitions: NpTransitionType = [
-                getattr(e, field) for e in experiences if e is not None
-            ]
+        warnings.warn(
+            "ReplayBuffer._process_transition is deprecated, since sampled transitions "
+            "are read from memory with a single gather per field.",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        transition = {
+            field: _stack_transitions([getattr(e, field) for e in experiences])
+            for field in self.field_names
+        }
+        return self._finalize_transition(transition, np_array)
+
+    def _pinned_buffer(
+        self, key: str, shape: Tuple[int, ...], dtype: np.dtype
+    ) -> np.ndarray:
+        """Returns a numpy view of the reusable pinned host buffer a field is staged in,
+        once the previous copy out of it is done.
+
+        :param key: Name of the field
+        :type key: str
+        :param shape: Shape of the staged batch
+        :type shape: tuple[int, ...]
+        :param dtype: Data type of the staged batch
+        :type dtype: numpy.dtype
+        :return: Pinned host buffer
+        :rtype: numpy.ndarray
+        """
+        key = (self._slot, key)
+        staging, copied = self._pinned_staging.get(key, (None, None))
+        if staging is None or staging.shape != shape or staging.numpy().dtype != dtype:
+            staging = torch.from_numpy(np.empty(shape, dtype=dtype)).pin_memory()
+            copied = torch.cuda.Event()
+            self._pinned_staging[key] = (staging, copied)
+        else:
+            copied.synchronize()
 
-            # Stack the transitions into a single array or tuple/dictionary of arrays
-            ts = ReplayBuffer.stack_transitions(field_transitions)
+        return staging.numpy()
 
-            # Handle integer fields
-            if field in [
-                "done",
-                "termination",
-                "terminated",
-                "truncation",
-                "truncated",
-            ]:
-                ts = ts.astype(np.uint8)
+    def _copy_pinned(self, key: str) -> torch.Tensor:
+        """Copies a staged field asynchronously into its reusable device buffer.
 
-            # Convert to torch tensor if specified
-            if not np_array:
-                ts = obs_to_tensor(ts, self.device)
+        :param key: Name of the field
+        :type key: str
+        :return: Field on the device, in its native dtype
+        :rtype: torch.Tensor
+        """
+        key = (self._slot, key)
+        staging, copied = self._pinned_staging[key]
+        on_device = self._device_buffers.get(key)
+        if (
+            on_device is None
+            or on_device.shape != staging.shape
+            or on_device.dtype != staging.dtype
+        ):
+            on_device = torch.empty_like(staging, device=self.device)
+            self._device_buffers[key] = on_device
+
+        on_device.copy_(staging, non_blocking=True)
+        copied.record()
+        return on_device
+
+    def _to_tensor(self, key: str, ts: NumpyObsType) -> TorchTransitionType:
+        """Converts a stacked field to float tensors on the buffer's device. Fields bound for
+        a CUDA device are copied into reusable pinned host buffers and transferred to the
+        device asynchronously in their native dtype, and only cast to float on the device.
+
+        :param key: Name of the field, used to look up its staging buffer
+        :type key: str
+        :param ts: Stacked field
+        :type ts: numpy.ndarray, dict[str, numpy.ndarray], tuple[numpy.ndarray, ...]
+        :return: Field as float tensors on the device
+        :rtype: torch.Tensor, dict[str, torch.Tensor], tuple[torch.Tensor, ...]
+        """
+        if isinstance(ts, dict):
+            return {k: self._to_tensor(f"{key}.{k}", v) for k, v in ts.items()}
+        elif isinstance(ts, tuple):
+            return tuple(self._to_tensor(f"{key}.{i}", v) for i, v in enumerate(ts))
+
+        if not self._pin_memory:
+            return obs_to_tensor(ts, self.device)
+
+        self._pinned_buffer(key, ts.shape, ts.dtype)[...] = ts
+        return self._copy_pinned(key).float()
+
+    def _gather_packed(
+        self, idxs: ArrayLike, extra: Dict[str, np.ndarray]
+    ) -> Dict[str, TorchTransitionType]:
+        """Gathers the experiences at the given indices, and any extra arrays, straight into
+        a single pinned host buffer, which is copied to the CUDA device with one transfer.
+        Each field is laid out in its own aligned byte range of the buffer in its native
+        dtype, and returned as float tensors viewing its range of the reused device buffer.
+
+        :param idxs: Indices of the experiences in memory
+        :type idxs: ArrayLike
+        :param extra: Extra arrays to transfer with the experiences, e.g. importance weights
+        :type extra: dict[str, numpy.ndarray]
+        :return: Transition dictionary of float tensors on the device
+        :rtype: dict
+        """
+        storages: Dict[str, np.ndarray] = {}
+        for field in self.field_names:
+            _flatten_fields(field, self.memory[field], storages)
+
+        arrays: Dict[str, np.ndarray] = {}
+        for key, value in extra.items():
+            _flatten_fields(key, value, arrays)
+
+        # Byte range of each array in the packed buffer
+        layout: Dict[str, Tuple[int, int, Tuple[int, ...], np.dtype]] = {}
+        total = 0
+        for key, value in {**storages, **arrays}.items():
+            shape = (len(idxs), *value.shape[1:]) if key in storages else value.shape
+            nbytes = int(np.prod(shape)) * value.dtype.itemsize
+            layout[key] = (total, nbytes, shape, value.dtype)
+            total += -(-nbytes // _PACKED_ALIGNMENT) * _PACKED_ALIGNMENT
+
+        staging = self._pinned_buffer("packed", (total,), np.dtype(np.uint8))
+        for key, (offset, nbytes, shape, dtype) in layout.items():
+            out = staging[offset : offset + nbytes].view(dtype).reshape(shape)
+            if key in storages:
+                # NOTE: Indices are always in range, 'clip' avoids numpy buffering the output
+                np.take(storages[key], idxs, axis=0, out=out, mode="clip")
+            else:
+                out[...] = arrays[key]
+
+        on_device = self._copy_pinned("packed")
+        tensors = {}
+        for key, (offset, nbytes, shape, dtype) in layout.items():
+            torch_dtype = torch.from_numpy(np.empty(0, dtype=dtype)).dtype
+            field = on_device[offset : offset + nbytes].view(torch_dtype)
+            tensors[key] = field.view(shape).float()
+
+        transition = {
+            field: _nest_fields(field, self.memory[field], tensors)
+            for field in self.field_names
+        }
+        transition.update(
+            {key: _nest_fields(key, value, tensors) for key, value in extra.items()}
+        )
+        return transition
 
-            transition[field] = ts
+    def _get_transition(
+        self,
+        idxs: ArrayLike,
+        np_array: bool = False,
+        extra: Optional[Dict[str, np.ndarray]] = None,
+        kind: str = "sample",
+    ) -> Dict[str, Any]:
+        """Returns transition dictionary of the experiences stored at the given indices.
+
+        :param idxs: Indices of the experiences in memory
+        :type idxs: ArrayLike
+        :param np_array: Flag to return numpy arrays instead of torch tensors, defaults to False
+        :type np_array: bool, optional
+        :param extra: Extra arrays to add to the transition, e.g. importance weights, defaults to None
+        :type extra: dict[str, numpy.ndarray], optional
+        :param kind: Kind of batch, whose staging and device buffers are alternated between,
+            defaults to 'sample'
+        :type kind: str, optional
+        :return: Transition dictionary
+        :rtype: dict
+        """
+        parity = self._slot_parity.get(kind, 1) ^ 1
+        self._slot_parity[kind] = parity
+        self._slot = (kind, parity)
+        extra = extra if extra is not None else {}
+
+        # Done fields needn't be cast to integers since the tensors are returned as floats
+        if not np_array and self._pin_memory:
+            return self._gather_packed(idxs, extra)
+
+        transition = {
+            field: _read_storage(self.memory[field], idxs) for field in self.field_names
+        }
+        transition = self._finalize_transition(transition, np_array)
+        for key, value in extra.items():
+            transition[key] = value if np_array else self._to_tensor(key, value)
 
         return transition
 
+    def _submit_prefetch(self, sample_fn: Callable, *args: Any) -> Future:
+        """Starts sampling a batch of experiences in a background thread.
+
+        :param sample_fn: Function that samples the batch
+        :type sample_fn: Callable
+        :param *args: Arguments to sample the batch with
+        :return: Future of the sampled batch
+        :rtype: concurrent.futures.Future
+        """
+        if self._prefetch_executor is None:
+            self._prefetch_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="replay_prefetch"
+            )
+
+        future = self._prefetch_executor.submit(self._with_lock, sample_fn, *args)
+        self._prefetched = (args, future)
+        return future
+
+    def _with_lock(self, fn: Callable, *args: Any) -> Any:
+        """Calls a function that reads or updates memory while holding the buffer's lock,
+        so that it never runs concurrently with a prefetch or a background write.
+
+        :param fn: Function to call
+        :type fn: Callable
+        :param *args: Arguments to call the function with
+        :return: Return value of the function
+        :rtype: Any
+        """
+        with self._lock:
+            return fn(*args)
+
+    def _prefetched_or_sample(self, sample_fn: Callable, *args: Any) -> Tuple[Any, ...]:
+        """Returns the prefetched batch if it was sampled with the same arguments, and
+        otherwise samples a new batch.
+
+        :param sample_fn: Function that samples the batch
+        :type sample_fn: Callable
+        :param *args: Arguments to sample the batch with
+        :return: Tuple of sampled experiences
+        :rtype: tuple
+        """
+        if self._prefetched is not None:
+            prefetched_args, future = self._prefetched
+            self._prefetched = None
+            batch = future.result()
+            if prefetched_args == args:
+                return batch
+
+        return self._with_lock(sample_fn, *args)
+
+    def prefetch(
+        self, batch_size: int, return_idx: bool = False, np_array: bool = False
+    ) -> Future:
+        """Samples a batch of experiences in a background thread, overlapping the sampling and
+        host-to-device copy with the current learning step. The next call to ``sample`` with
+        the same arguments returns the prefetched batch.
+
+        :param batch_size: Number of samples to return
+        :type batch_size: int
+        :param return_idx: Boolean flag to return index of samples randomly selected, defaults to False
+        :type return_idx: bool, optional
+        :param np_array: Flag to return numpy arrays instead of torch tensors, defaults to False
+        :type np_array: bool, optional
+        :return: Future of the sampled experiences
+        :rtype: concurrent.futures.Future
+        """
+        return self._submit_prefetch(self._sample, batch_size, return_idx, np_array)
+
     def sample(
         self, batch_size: int, return_idx: bool = False, np_array: bool = False
     ) -> Tuple[Any, ...]:
         """Returns sample of experiences from memory.
 
+        :param batch_size: Number of samples to return
+        :type batch_size: int
+        :param return_idx: Boolean flag to return index of samples randomly selected, defaults to False
+        :type return_idx: bool, optional
+        :param np_array: Flag to return numpy arrays instead of torch tensors, defaults to False
+        :type np_array: bool, optional
+        :return: Tuple of sampled experiences
+        :rtype: tuple
+        """
+        return self._prefetched_or_sample(
+            self._sample, batch_size, return_idx, np_array
+        )
+
+    def _sample(
+        self, batch_size: int, return_idx: bool = False, np_array: bool = False
+    ) -> Tuple[Any, ...]:
+        """Samples a batch of experiences from memory.
+
         :param batch_size: Number of samples to return
         :type batch_size: int
         :param return_idx: Boolean flag to return index of samples randomly selected, defaults to False
@@ -140,13 +757,12 @@ class ReplayBuffer:
         :rtype: tuple
         """
         if return_idx:
-            idxs = np.random.choice(len(self.memory), size=batch_size, replace=False)
-            experiences = list(map(lambda i: self.memory[i], idxs))
-            transition = self._process_transition(experiences, np_array)
+            idxs = self._rng.choice(len(self), size=batch_size, replace=False)
+            transition = self._get_transition(idxs, np_array)
             transition["idxs"] = idxs
         else:
-            experiences = random.sample(self.memory, k=batch_size)
-            transition = self._process_transition(experiences, np_array)
+            idxs = self._rng.integers(0, len(self), size=batch_size, dtype=np.int64)
+            transition = self._get_transition(idxs, np_array)
 
         return tuple(transition.values())
 
@@ -165,9 +781,8 @@ class ReplayBuffer:
         :param *args: Variable length argument list. Contains batched transition elements in consistent order,
             e.g. states, actions, rewards, next_states, dones
         """
-        for transition in zip(*args):
-            self._add(*transition)
-            self.counter += 1
+        self._add_batch(*args)
+        self.counter += _batch_len(args[0])
 
     def save_to_memory(self, *args: Any, is_vectorised: bool = False) -> None:
         """Applies appropriate save_to_memory function depending on whether
@@ -183,6 +798,92 @@ class ReplayBuffer:
         else:
             self.save_to_memory_single_env(*args)
 
+    def async_add(self, *args: Any, is_vectorised: bool = False) -> None:
+        """Queues experiences to be saved to memory by a background writer thread, so that
+        saving them is overlapped with stepping the environment. Experiences are saved in
+        the order they are queued, and the arrays passed mustn't be modified afterwards.
+        Unlike ``save_to_memory``, nothing is returned. Use ``flush`` to wait until all
+        queued experiences have been saved, e.g. before saving experiences synchronously.
+
+        :param *args: Variable length argument list. Contains batched or unbatched transition elements in consistent order,
+            e.g. states, actions, rewards, next_states, dones
+        :param is_vectorised: Boolean flag indicating if the environment has been vectorised
+        :type is_vectorised: bool
+        """
+        self._raise_write_error()
+        if self._write_queue is None:
+            self._write_queue = queue.Queue()
+            self._write_thread = threading.Thread(
+                target=self._write_worker,
+                args=(weakref.ref(self), self._write_queue),
+                name="replay_writer",
+                daemon=True,
+            )
+            self._write_thread.start()
+            self._write_finalizer = weakref.finalize(self, self._write_queue.put, None)
+
+        self._write_queue.put((args, is_vectorised))
+
+    def flush(self) -> None:
+        """Blocks until all experiences queued with ``async_add`` have been saved to memory."""
+        if self._write_queue is not None:
+            self._write_queue.join()
+
+        self._raise_write_error()
+
+    def close(self) -> None:
+        """Saves the experiences queued with ``async_add`` to memory, then stops the
+        background writer and prefetch threads. Experiences can still be added and sampled
+        afterwards, which restarts the threads if needed."""
+        if self._write_queue is not None:
+            self._write_finalizer()
+            self._write_thread.join()
+            self._write_queue = None
+            self._write_thread = None
+            self._write_finalizer = None
+
+        if self._prefetch_executor is not None:
+            self._prefetch_executor.shutdown()
+            self._prefetch_executor = None
+            self._prefetched = None
+
+        self._raise_write_error()
+
+    @staticmethod
+    def _write_worker(
+        buffer_ref: "weakref.ref[ReplayBuffer]", write_queue: queue.Queue
+    ) -> None:
+        """Saves the experiences queued with ``async_add`` to memory, until ``None`` is
+        queued or the buffer has been garbage collected.
+
+        :param buffer_ref: Weak reference to the buffer
+        :type buffer_ref: weakref.ref[ReplayBuffer]
+        :param write_queue: Queue of experiences to save
+        :type write_queue: queue.Queue
+        """
+        while True:
+            item = write_queue.get()
+            buffer = buffer_ref() if item is not None else None
+            try:
+                if buffer is None:
+                    return
+
+                args, is_vectorised = item
+                with buffer._lock:
+                    buffer.save_to_memory(*args, is_vectorised=is_vectorised)
+            except BaseException as e:
+                buffer._write_error = e
+            finally:
+                # Doesn't keep the buffer alive while waiting for the next experiences
+                buffer = None
+                write_queue.task_done()
+
+    def _raise_write_error(self) -> None:
+        """Raises the error the background writer thread failed with, if any."""
+        if self._write_error is not None:
+            error, self._write_error = self._write_error, None
+            raise error
+
 
 class MultiStepReplayBuffer(ReplayBuffer):
     """The Multi-step Experience Replay Buffer class. Used to store experiences and allow
@@ -190,7 +891,7 @@ class MultiStepReplayBuffer(ReplayBuffer):
 
     :param memory_size: Maximum length of replay buffer
     :type memory_size: int
-    :param field_names: Field names for experience named tuple, e.g. ['state', 'action', 'reward']
+    :param field_names: Field names of the experiences, e.g. ['state', 'action', 'reward']
     :type field_names: list[str]
     :param num_envs: Number of parallel environments for training
     :type num_envs: int
@@ -200,6 +901,8 @@ class MultiStepReplayBuffer(ReplayBuffer):
     :type gamma: float, optional
     :param device: Device for accelerated computing, 'cpu' or 'cuda', defaults to None
     :type device: str, optional
+    :param state_dtype: Data type to store image observations as, e.g. np.uint8, defaults to None
+    :type state_dtype: numpy.dtype, optional
     """
 
     def __init__(
@@ -210,8 +913,9 @@ class MultiStepReplayBuffer(ReplayBuffer):
         n_step: int = 3,
         gamma: float = 0.99,
         device: Optional[str] = None,
+        state_dtype: Optional[np.dtype] = None,
     ):
-        super().__init__(memory_size, field_names, device)
+        super().__init__(memory_size, field_names, device, state_dtype)
         assert (
             "reward" in field_names
         ), "Reward must be saved in replay buffer under the field name 'reward'."
@@ -239,8 +943,7 @@ class MultiStepReplayBuffer(ReplayBuffer):
         :rtype: tuple
         """
         self.args_deque.append(args)
-        transition = self.experience(*args)
-        self.n_step_buffers[0].append(transition)
+        self.n_step_buffers[0].append(args)
 
         # single step transition is not ready
         if len(self.n_step_buffers[0]) < self.n_step:
@@ -263,8 +966,7 @@ class MultiStepReplayBuffer(ReplayBuffer):
         """
         self.args_deque.append(args)
         for buffer, *transition in zip(self.n_step_buffers, *args):
-            transition = self.experience(*transition)
-            buffer.append(transition)
+            buffer.append(tuple(transition))
 
         # single step transition is not ready
         if any(len(buffer) < self.n_step for buffer in self.n_step_buffers):
@@ -286,62 +988,47 @@ class MultiStepReplayBuffer(ReplayBuffer):
         :return: Tuple of sampled experiences
         :rtype: tuple
         """
-        experiences = list(map(lambda i: self.memory[i], idxs))
-        transition = self._process_transition(experiences)
+        with self._lock:
+            transition = self._get_transition(idxs, kind="indices")
+
         return tuple(transition.values())
 
     def _get_n_step_info(
-        self, n_step_buffer: Deque[NamedTuple], gamma: float
+        self, n_step_buffer: Deque[Tuple[Any, ...]], gamma: float
     ) -> Tuple[Any, ...]:
         """Returns n step reward, next_state, and done, as well as other saved transition elements, in order.
 
-        :param n_step_buffer: Buffer containing n-step transitions
+        :param n_step_buffer: Buffer containing n-step transitions, as tuples of transition elements
         :type n_step_buffer: deque
         :param gamma: Discount factor
         :type gamma: float
         :return: Tuple containing n-step transition elements
         :rtype: tuple
         """
+        reward_idx = self.field_names.index("reward")
+        next_state_idx = self.field_names.index("next_state")
+        for done_field in ["done", "termination", "terminated"]:
+            if done_field in self.field_names:
+                done_idx = self.field_names.index(done_field)
+                break
+
         # info of the last transition
-        t = [n_step_buffer[0]]
-        transition = self._process_transition(t, np_array=True)
-
-        vect_reward = transition["reward"][0]
-        vect_next_state = transition["next_state"][0]
-        if "done" in transition.keys():
-            vect_done = transition["done"][0]
-        elif "termination" in transition.keys():
-            vect_done = transition["termination"][0]
-        else:
-            vect_done = transition["terminated"][0]
+        transition = list(n_step_buffer[0])
+        vect_reward = np.atleast_1d(np.array(transition[reward_idx], dtype=np.float64))
+        vect_next_state = transition[next_state_idx]
+        vect_done = transition[done_idx]
 
         for idx, ts in enumerate(list(n_step_buffer)[1:]):
-            if not vect_done:
-                vect_r, vect_n_s = (ts.reward, ts.next_state)
-
-                if "done" in transition.keys():
-                    vect_d = ts.done
-                elif "termination" in transition.keys():
-                    vect_d = ts.termination
-                else:
-                    vect_d = ts.terminated
-
-                vect_reward += vect_r * gamma ** (idx + 1)
-                vect_done = np.array([vect_d])
-                vect_next_state = vect_n_s
-
-        transition["reward"] = vect_reward
-        transition["next_state"] = vect_next_state
-        if "done" in transition.keys():
-            transition["done"] = vect_done
-        elif "termination" in transition.keys():
-            transition["termination"] = vect_done
-        else:
-            transition["terminated"] = vect_done
-        transition["state"] = transition["state"][0]
-        transition["action"] = transition["action"][0]
+            if not np.any(vect_done):
+                vect_reward += np.asarray(ts[reward_idx]) * gamma ** (idx + 1)
+                vect_done = ts[done_idx]
+                vect_next_state = ts[next_state_idx]
 
-        return tuple(transition.values())
+        transition[reward_idx] = vect_reward
+        transition[next_state_idx] = vect_next_state
+        transition[done_idx] = vect_done
+
+        return tuple(transition)
 
 
 class PrioritizedReplayBuffer(MultiStepReplayBuffer):
@@ -350,7 +1037,7 @@ class PrioritizedReplayBuffer(MultiStepReplayBuffer):
 
     :param memory_size: Maximum length of replay buffer
     :type memory_size: int
-    :param field_names: Field names for experience named tuple, e.g. ['state', 'action', 'reward']
+    :param field_names: Field names of the experiences, e.g. ['state', 'action', 'reward']
     :type field_names: list[str]
     :param num_envs: Number of parallel environments for training
     :type num_envs: int
@@ -362,6 +1049,8 @@ class PrioritizedReplayBuffer(MultiStepReplayBuffer):
     :type gamma: float, optional
     :param device: Device for accelerated computing, 'cpu' or 'cuda', defaults to None
     :type device: str, optional
+    :param state_dtype: Data type to store image observations as, e.g. np.uint8, defaults to None
+    :type state_dtype: numpy.dtype, optional
     """
 
     def __init__(
@@ -373,8 +1062,11 @@ class PrioritizedReplayBuffer(MultiStepReplayBuffer):
         n_step: int = 1,
         gamma: float = 0.99,
         device: Optional[str] = None,
+        state_dtype: Optional[np.dtype] = None,
     ):
-        super().__init__(memory_size, field_names, num_envs, n_step, gamma, device)
+        super().__init__(
+            memory_size, field_names, num_envs, n_step, gamma, device, state_dtype
+        )
         self.max_priority, self.tree_ptr = 1.0, 0
         self.alpha = alpha
 
@@ -386,16 +1078,51 @@ class PrioritizedReplayBuffer(MultiStepReplayBuffer):
         self.sum_tree = SumSegmentTree(tree_capacity)
         self.min_tree = MinSegmentTree(tree_capacity)
 
+        # Priority updates passed as tensors, applied to the trees before the next sample
+        self._pending_priorities: List[
+            Tuple[ArrayLike, torch.Tensor, Optional[torch.cuda.Event]]
+        ] = []
+
     def _add(self, *args: Any) -> None:
         """Adds experience to memory and updates priority trees.
 
         :param *args: Variable length argument list. Contains transition elements in consistent order,
             e.g. state, action, reward, next_state, done
         """
-        super()._add(*args)
-        self.sum_tree[self.tree_ptr] = self.max_priority**self.alpha
-        self.min_tree[self.tree_ptr] = self.max_priority**self.alpha
-        self.tree_ptr = (self.tree_ptr + 1) % self.memory_size
+        with self._lock:
+            super()._add(*args)
+            self.sum_tree[self.tree_ptr] = self.max_priority**self.alpha
+            self.min_tree[self.tree_ptr] = self.max_priority**self.alpha
+            self.tree_ptr = (self.tree_ptr + 1) % self.memory_size
+
+    def _add_batch(self, *args: Any) -> None:
+        """Adds a batch of experiences to memory and updates priority trees.
+
+        :param *args: Variable length argument list. Contains batched transition elements in consistent order,
+            e.g. states, actions, rewards, next_states, dones
+        """
+        with self._lock:
+            super()._add_batch(*args)
+            n = _batch_len(args[0])
+            idxs = (self.tree_ptr + np.arange(n)) % self.memory_size
+            self.sum_tree.update(idxs, self.max_priority**self.alpha)
+            self.min_tree.update(idxs, self.max_priority**self.alpha)
+            self.tree_ptr = (self.tree_ptr + n) % self.memory_size
+
+    def prefetch(self, batch_size: int, beta: float = 0.4) -> Future:
+        """Samples a batch of experiences in a background thread, overlapping the sampling and
+        host-to-device copy with the current learning step. The next call to ``sample`` with
+        the same arguments returns the prefetched batch, which doesn't reflect priorities
+        updated after it was sampled.
+
+        :param batch_size: Number of samples to return
+        :type batch_size: int
+        :param beta: Beta parameter for importance sampling, defaults to 0.4
+        :type beta: float, optional
+        :return: Future of the sampled experiences
+        :rtype: concurrent.futures.Future
+        """
+        return self._submit_prefetch(self._sample, batch_size, beta)
 
     def sample(self, batch_size: int, beta: float = 0.4) -> Tuple[Any, ...]:
         """Returns sample of experiences from memory.
@@ -407,53 +1134,127 @@ class PrioritizedReplayBuffer(MultiStepReplayBuffer):
         :return: Tuple of sampled experiences
         :rtype: tuple
         """
-        idxs = self._sample_proportional(batch_size)
-        experiences = [self.memory[i] for i in idxs]
-        transition = self._process_transition(experiences)
+        return self._prefetched_or_sample(self._sample, batch_size, beta)
 
-        weights = torch.from_numpy(
-            np.array([self._calculate_weight(i, beta) for i in idxs])
-        ).float()
+    def _sample(self, batch_size: int, beta: float = 0.4) -> Tuple[Any, ...]:
+        """Samples a batch of experiences from memory.
 
-        if self.device is not None:
-            weights = weights.to(self.device)
+        :param batch_size: Number of samples to return
+        :type batch_size: int
+        :param beta: Beta parameter for importance sampling, defaults to 0.4
+        :type beta: float, optional
+        :return: Tuple of sampled experiences
+        :rtype: tuple
+        """
+        self._flush_priorities()
+        idxs = self._sample_proportional(batch_size)
 
-        transition["weights"] = weights
-        transition["idxs"] = idxs
+        # Weights are transferred to the device together with the experiences
+        weights = self._calculate_weights(idxs, beta).astype(np.float32)
+        transition = self._get_transition(idxs, extra={"weights": weights})
+        transition["idxs"] = idxs.tolist()
 
         return tuple(transition.values())
 
-    def update_priorities(self, idxs: List[int], priorities: List[float]) -> None:
-        """Update priorities of sampled transitions.
+    def update_priorities(
+        self, idxs: List[int], priorities: Union[List[float], ArrayLike, torch.Tensor]
+    ) -> None:
+        """Update priorities of sampled transitions. Priorities passed as a tensor are copied
+        to the host asynchronously and only written to the priority trees at the start of
+        the next sample, so that updating them doesn't synchronise with the device. Until
+        then, ``max_priority`` (which experiences added in the meantime are given) and the
+        sampling distribution don't reflect them.
+
+        :param idxs: Indices of sampled transitions
+        :type idxs: list[int]
+        :param priorities: New priorities of sampled transitions
+        :type priorities: list[float], numpy.ndarray, torch.Tensor
+        """
+        if isinstance(priorities, torch.Tensor):
+            priorities = priorities.detach().reshape(-1)
+            event = None
+            if priorities.is_cuda:
+                priorities = priorities.to("cpu", non_blocking=True)
+                event = torch.cuda.Event()
+                event.record()
+
+            with self._lock:
+                self._pending_priorities.append((idxs, priorities, event))
+            return
+
+        with self._lock:
+            # Pending updates were made first, so are applied first
+            self._flush_priorities()
+            self._update_priorities(idxs, priorities)
+
+    def _update_priorities(
+        self, idxs: List[int], priorities: Union[List[float], ArrayLike]
+    ) -> None:
+        """Writes the priorities of sampled transitions to the priority trees.
 
         :param idxs: Indices of sampled transitions
         :type idxs: list[int]
         :param priorities: New priorities of sampled transitions
-        :type priorities: list[float]
+        :type priorities: list[float], numpy.ndarray
         """
-        for idx, priority in zip(idxs, priorities):
-            self.sum_tree[idx] = priority**self.alpha
-            self.min_tree[idx] = priority**self.alpha
-            self.max_priority = max(self.max_priority, priority)
+        priorities = np.asarray(priorities, dtype=np.float64).reshape(-1)
+        if len(priorities) == 0:
+            return
+
+        self.sum_tree.update(idxs, priorities**self.alpha)
+        self.min_tree.update(idxs, priorities**self.alpha)
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+
+    def _flush_priorities(self) -> None:
+        """Applies the pending priority updates, in the order they were made, with a single
+        pass over the priority trees."""
+        pending, self._pending_priorities = self._pending_priorities, []
+        if not pending:
+            return
+
+        for _, _, event in pending:
+            if event is not None:
+                event.synchronize()
+
+        idxs = np.concatenate([np.asarray(idx) for idx, _, _ in pending])
+        priorities = torch.cat([p for _, p, _ in pending]).numpy()
+        self._update_priorities(idxs, priorities)
 
-    def _sample_proportional(self, batch_size: int) -> List[int]:
-        """Sample indices based on proportions.
+    def _sample_proportional(self, batch_size: int) -> np.ndarray:
+        """Sample indices based on proportions, drawing one upper bound uniformly from
+        each of ``batch_size`` equal segments of the total priority.
 
         :param batch_size: Sample size
         :type batch_size: int
-        :return: List of sampled indices
-        :rtype: list[int]
+        :return: Array of sampled indices
+        :rtype: numpy.ndarray
         """
-        idxs = []
         p_total = self.sum_tree.sum(0, len(self) - 1)
         segment = p_total / batch_size
-        for i in range(batch_size):
-            a = segment * i
-            b = segment * (i + 1)
-            upperbound = random.uniform(a, b)
-            idx = self.sum_tree.retrieve(upperbound)
-            idxs.append(idx)
-        return idxs
+        upperbounds = segment * (np.arange(batch_size) + self._rng.random(batch_size))
+        return self.sum_tree.retrieve_batch(upperbounds)
+
+    def _calculate_weights(self, idxs: ArrayLike, beta: float) -> np.ndarray:
+        """Calculate the weights of the experiences at idxs.
+
+        :param idxs: Indices of the experiences
+        :type idxs: numpy.ndarray
+        :param beta: Beta parameter for importance sampling
+        :type beta: float
+        :return: Weights of the experiences
+        :rtype: numpy.ndarray
+        """
+        p_total = self.sum_tree.sum()
+
+        # get max weight
+        p_min = self.min_tree.min() / p_total
+        max_weight = (p_min * len(self)) ** (-beta)
+
+        # calculate weights
+        p_samples = self.sum_tree[np.asarray(idxs)] / p_total
+        weights = (p_samples * len(self)) ** (-beta)
+
+        return weights / max_weight
 
     def _calculate_weight(self, idx: int, beta: float) -> float:
         """Calculate the weight of the experience at idx.
@@ -1,6 +1,9 @@
 import operator
 from typing import Callable
 
+import numpy as np
+from numpy.typing import ArrayLike
+
 
 class SegmentTree:
     """Create SegmentTree.
@@ -10,7 +13,7 @@ class SegmentTree:
 
     Attributes:
         capacity (int)
-        tree (list)
+        tree (np.ndarray)
         operation (function)
 
     """
@@ -20,7 +23,7 @@ class SegmentTree:
 
         Args:
             capacity (int)
-            operation (function)
+            operation (function): Binary operation, applied elementwise to arrays
             init_value (float)
 
         """
@@ -28,7 +31,7 @@ class SegmentTree:
             capacity > 0 and capacity & (capacity - 1) == 0
         ), "capacity must be positive and a power of 2."
         self.capacity = capacity
-        self.tree = [init_value for _ in range(2 * capacity)]
+        self.tree = np.full(2 * capacity, init_value, dtype=np.float64)
         self.operation = operation
 
     def _operate_helper(
@@ -67,9 +70,23 @@ class SegmentTree:
             self.tree[idx] = self.operation(self.tree[2 * idx], self.tree[2 * idx + 1])
             idx //= 2
 
+    def update(self, idxs: ArrayLike, vals: ArrayLike):
+        """Set values in tree for a batch of indices, updating each level of the tree
+        with a single vectorized operation. Later values take precedence for repeated indices.
+        """
+        idxs = np.asarray(idxs, dtype=np.int64) + self.capacity
+        self.tree[idxs] = vals
+
+        idxs = np.unique(idxs // 2)
+        while len(idxs) and idxs[0] >= 1:
+            self.tree[idxs] = self.operation(
+                self.tree[2 * idxs], self.tree[2 * idxs + 1]
+            )
+            idxs = np.unique(idxs // 2)
+
     def __getitem__(self, idx: int) -> float:
-        """Get real value in leaf node of tree."""
-        assert 0 <= idx < self.capacity
+        """Get real value in leaf node of tree. Also accepts an array of indices."""
+        assert np.all((0 <= idx) & (idx < self.capacity))
 
         return self.tree[self.capacity + idx]
 
@@ -112,6 +129,22 @@ class SumSegmentTree(SegmentTree):
                 idx = right
         return idx - self.capacity
 
+    def retrieve_batch(self, upperbounds: ArrayLike) -> np.ndarray:
+        """Find the highest index `i` about each upper bound in the tree, descending
+        the tree for all upper bounds at once."""
+        upperbounds = np.array(upperbounds, dtype=np.float64)
+        idxs = np.ones(len(upperbounds), dtype=np.int64)
+
+        # All nodes are at the same depth since capacity is a power of 2
+        while len(idxs) and idxs[0] < self.capacity:
+            left = 2 * idxs
+            left_vals = self.tree[left]
+            go_right = left_vals <= upperbounds
+            upperbounds -= np.where(go_right, left_vals, 0.0)
+            idxs = left + go_right
+
+        return idxs - self.capacity
+
 
 class MinSegmentTree(SegmentTree):
     """Create SegmentTree.
@@ -128,7 +161,9 @@ class MinSegmentTree(SegmentTree):
             capacity (int)
 
         """
-        super().__init__(capacity=capacity, operation=min, init_value=float("inf"))
+        super().__init__(
+            capacity=capacity, operation=np.minimum, init_value=float("inf")
+        )
 
     def min(self, start: int = 0, end: int = 0) -> float:
         """Returns min(arr[start], ...,  arr[end])."""
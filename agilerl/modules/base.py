@@ -1,6 +1,6 @@
 import copy
 import inspect
-from functools import wraps
+from functools import lru_cache, wraps
 from typing import (
     Any,
     Callable,
@@ -26,6 +26,20 @@ from agilerl.utils.algo_utils import recursive_check_module_attrs
 SelfEvolvableModule = TypeVar("SelfEvolvableModule", bound="EvolvableModule")
 
 
+@lru_cache(maxsize=None)
+def get_constructor_args(cls: type) -> Tuple[str, ...]:
+    """Get the names of the constructor arguments of a module class, excluding ``self``.
+    These are cached per class since they are looked up whenever a module is saved,
+    cloned or loaded.
+
+    :param cls: The module class.
+    :type cls: type
+    :return: Names of the constructor arguments.
+    :rtype: Tuple[str, ...]
+    """
+    return tuple(inspect.signature(cls.__init__).parameters.keys())[1:]
+
+
 def is_evolvable(attr: str, obj: Any) -> bool:
     """Check if an attribute of a module is evolvable.
 
@@ -309,10 +323,10 @@ class EvolvableModule(nn.Module, metaclass=ModuleMeta):
         :return: The dictionary of constructor arguments.
         :rtype: Dict[str, Any]
         """
-        constructor_args = inspect.signature(self.__init__).parameters
+        constructor_args = get_constructor_args(type(self))
 
         try:
-            return {k: getattr(self, k) for k in constructor_args.keys()}
+            return {k: getattr(self, k) for k in constructor_args}
         except AttributeError:
             raise AttributeError(
                 "Custom EvolvableModule objects must be explicit about their "
@@ -5,6 +5,7 @@ from typing import Any, Dict, List, Optional, Tuple
 
 import gymnasium as gym
 import numpy as np
+import torch
 import wandb
 from accelerate import Accelerator
 from torch.utils.data import DataLoader
@@ -432,6 +433,9 @@ def train_off_policy(
                     mean_loss = np.mean(
                         [loss for loss in actor_losses if loss is not None]
                     ), np.mean(critic_losses)
+                elif isinstance(losses[-1], torch.Tensor):
+                    # Losses kept on the device are synchronised once per evolution step
+                    mean_loss = torch.stack(losses).mean().item()
                 else:
                     mean_loss = np.mean(losses)
 
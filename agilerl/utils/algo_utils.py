@@ -18,6 +18,7 @@ from torch.optim import Optimizer
 from agilerl.protocols import EvolvableAttributeType, EvolvableModule, OptimizerWrapper
 from agilerl.typing import (
     ArrayOrTensor,
+    DeviceType,
     MaybeObsList,
     NetworkType,
     NumpyObsType,
@@ -259,26 +260,102 @@ def recursive_check_module_attrs(obj: Any, networks_only: bool = False) -> bool:
 
 
 def chkpt_attribute_to_device(
-    chkpt_dict: Dict[str, torch.Tensor], device: str
-) -> Dict[str, Any]:
-    """Place checkpoint attributes on device. Used when loading saved agents.
+    chkpt_dict: Union[Dict[str, Any], List[Any]], device: DeviceType
+) -> Union[Dict[str, Any], List[Any]]:
+    """Place checkpoint attributes on device. Used when loading saved agents. Tensors
+    nested in dictionaries and lists are collected in a single pass and moved in place.
+    On CUDA devices the copies are issued on a dedicated stream, which the current
+    stream waits on.
 
     :param chkpt_dict: Checkpoint dictionary
     :type chkpt_dict: dict
     :param device: Device for accelerated computing, 'cpu' or 'cuda'
     :type device: str
     """
-    if isinstance(chkpt_dict, list):
-        return [chkpt_attribute_to_device(chkpt, device) for chkpt in chkpt_dict]
+    assert isinstance(
+        chkpt_dict, (dict, list)
+    ), f"Expected dict or list, got {type(chkpt_dict)}"
+
+    # Collect the containers and keys of every tensor in the checkpoint
+    leaves: List[Tuple[Union[Dict[str, Any], List[Any]], Any]] = []
+    stack = [chkpt_dict]
+    while stack:
+        container = stack.pop()
+        items = (
+            container.items() if isinstance(container, dict) else enumerate(container)
+        )
+        for key, value in items:
+            if isinstance(value, torch.Tensor):
+                leaves.append((container, key))
+            elif isinstance(value, (dict, list)):
+                stack.append(value)
+
+    tensors = [container[key] for container, key in leaves]
+    device = torch.device(device)
+    if device.type == "cuda" and tensors:
+        current_stream = torch.cuda.current_stream(device)
+        copy_stream = torch.cuda.Stream(device=device)
+        copy_stream.wait_stream(current_stream)
+        with torch.cuda.stream(copy_stream):
+            tensors = [t.to(device, non_blocking=True) for t in tensors]
+
+        current_stream.wait_stream(copy_stream)
+        for tensor in tensors:
+            # Memory allocated on the copy stream is used on the current stream
+            tensor.record_stream(current_stream)
+    else:
+        tensors = [t.to(device) for t in tensors]
 
-    assert isinstance(chkpt_dict, dict), f"Expected dict, got {type(chkpt_dict)}"
+    for (container, key), tensor in zip(leaves, tensors):
+        container[key] = tensor
 
-    for key, value in chkpt_dict.items():
-        if isinstance(value, torch.Tensor):
-            chkpt_dict[key] = value.to(device)
     return chkpt_dict
 
 
+def packed_to_device(
+    tensors: List[torch.Tensor], device: Union[str, torch.device]
+) -> List[torch.Tensor]:
+    """Moves a list of host tensors to a device with a single copy per dtype. Tensors
+    sharing a dtype are packed into one contiguous (pinned, if the target is a CUDA
+    device) buffer which is transferred at once and split back into views on the device.
+
+    .. note::
+        The returned tensors are views of a single device buffer per dtype, so any one
+        of them keeps the whole buffer alive. Only use this for short-lived transfers
+        such as sampled batches, and ``.clone()`` any tensor that must outlive them.
+
+    :param tensors: Tensors to move to device
+    :type tensors: List[torch.Tensor]
+    :param device: Device to move the tensors to
+    :type device: Union[str, torch.device]
+
+    :return: Tensors on the device, in the same order as the input
+    :rtype: List[torch.Tensor]
+    """
+    device = torch.device(device)
+    non_blocking = device.type == "cuda"
+    if device.type == "cpu":
+        return [t.to(device) for t in tensors]
+
+    on_device: List[Optional[torch.Tensor]] = [None] * len(tensors)
+    groups: Dict[torch.dtype, List[int]] = defaultdict(list)
+    for i, t in enumerate(tensors):
+        if t.device.type == "cpu":
+            groups[t.dtype].append(i)
+        else:
+            on_device[i] = t.to(device, non_blocking=non_blocking)
+
+    for dtype, idxs in groups.items():
+        numels = [tensors[i].numel() for i in idxs]
+        packed = torch.empty(sum(numels), dtype=dtype, pin_memory=non_blocking)
+        torch.cat([tensors[i].reshape(-1) for i in idxs], out=packed)
+        packed = packed.to(device, non_blocking=non_blocking)
+        for i, chunk in zip(idxs, packed.split(numels)):
+            on_device[i] = chunk.view(tensors[i].shape)
+
+    return on_device
+
+
 def key_in_nested_dict(nested_dict: Dict[str, Any], target: str) -> bool:
     """Helper function to determine if key is in nested dictionary
 
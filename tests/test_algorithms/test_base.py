@@ -11,6 +11,7 @@ from agilerl.algorithms.core.registry import (
     NetworkGroup,
     RLParameter,
 )
+from agilerl.algorithms.dqn_rainbow import RainbowDQN
 from agilerl.modules import EvolvableCNN, EvolvableMLP, EvolvableMultiInput
 from agilerl.utils.evolvable_networks import is_image_space
 from tests.helper_functions import (
@@ -220,6 +221,27 @@ def test_population_multi_agent():
         assert agent.index == i
 
 
+def test_copy_attributes_preserves_aliasing():
+    observation_space = generate_random_box_space((4,))
+    action_space = generate_discrete_space(4)
+    agent = DummyRLAlgorithm(observation_space, action_space, index=0)
+    clone = DummyRLAlgorithm(observation_space, action_space, index=1)
+
+    shared_tensor = torch.randn(3)
+    shared_list = [1, 2]
+    agent.tensor_a = agent.tensor_b = shared_tensor
+    agent.list_a = agent.list_b = shared_list
+    clone.tensor_a, clone.tensor_b = torch.zeros(3), torch.zeros(3)
+
+    clone = DummyRLAlgorithm.copy_attributes(agent, clone)
+
+    assert clone.tensor_a is clone.tensor_b
+    assert clone.tensor_a is not shared_tensor
+    assert torch.equal(clone.tensor_a, shared_tensor)
+    assert clone.list_a is clone.list_b
+    assert clone.list_a is not shared_list
+
+
 def test_incorrect_hp_config():
     with pytest.raises(AttributeError):
         hp_config = HyperparameterConfig(lr_actor=RLParameter(min=0.1, max=0.2))
@@ -385,6 +407,120 @@ def test_save_load_checkpoint_multi_agent(tmpdir, with_hp_config, observation_sp
     assert new_agent.agent_ids == agent.agent_ids
 
 
+def test_save_load_checkpoint_split_tensors(tmpdir):
+    observation_space = generate_random_box_space((4,))
+    action_space = generate_discrete_space(4)
+    agent = DummyRLAlgorithm(observation_space, action_space, index=0)
+    checkpoint_path = Path(tmpdir) / "checkpoint.pth"
+    agent.save_checkpoint(checkpoint_path, split_tensors=True)
+
+    # Tensors are saved to a separate file that can be loaded without dill
+    tensors = torch.load(f"{checkpoint_path}.tensors", weights_only=True)
+    assert len(tensors) > 0
+    assert all(isinstance(t, torch.Tensor) for t in tensors.values())
+
+    new_agent = DummyRLAlgorithm(observation_space, action_space, index=1)
+    new_agent.load_checkpoint(checkpoint_path)
+    loaded_agent = DummyRLAlgorithm.load(checkpoint_path)
+
+    for a in [new_agent, loaded_agent]:
+        assert a.index == agent.index
+        assert not hasattr(a, "checkpoint_version")
+        assert str(a.dummy_actor.state_dict()) == str(agent.dummy_actor.state_dict())
+        assert str(a.dummy_optimizer.state_dict()) == str(
+            agent.dummy_optimizer.state_dict()
+        )
+
+    # Saving back to the same path rewrites the tensors file under the loaded agent
+    actor_state_dict = str(new_agent.dummy_actor.state_dict())
+    new_agent.save_checkpoint(checkpoint_path, split_tensors=True)
+    torch.save(
+        {key: torch.zeros_like(t) for key, t in tensors.items()},
+        f"{checkpoint_path}.tensors",
+    )
+    assert str(new_agent.dummy_actor.state_dict()) == actor_state_dict
+
+
+def test_load_checkpoint_reuses_compatible_modules(tmpdir):
+    observation_space = generate_random_box_space((4,))
+    action_space = generate_discrete_space(4)
+    agent = DummyRLAlgorithm(observation_space, action_space, index=0)
+    checkpoint_path = Path(tmpdir) / "checkpoint.pth"
+    agent.save_checkpoint(checkpoint_path)
+
+    new_agent = DummyRLAlgorithm(observation_space, action_space, index=1)
+    actor = new_agent.dummy_actor
+    optimizer = new_agent.dummy_optimizer
+    new_agent.load_checkpoint(checkpoint_path)
+
+    # Architecture is unchanged so the state is loaded into the existing objects
+    assert new_agent.dummy_actor is actor
+    assert new_agent.dummy_optimizer is optimizer
+    assert str(new_agent.dummy_actor.state_dict()) == str(
+        agent.dummy_actor.state_dict()
+    )
+
+    # Architecture differs so the modules and optimizer are reconstructed
+    agent.dummy_actor = EvolvableMLP(4, 4, hidden_size=[16])
+    agent.dummy_optimizer = OptimizerWrapper(
+        optim.Adam,
+        agent.dummy_actor,
+        agent.lr,
+        network_names=["dummy_actor"],
+        lr_name="lr",
+    )
+    agent.save_checkpoint(checkpoint_path)
+    new_agent.load_checkpoint(checkpoint_path)
+
+    assert new_agent.dummy_actor is not actor
+    assert new_agent.dummy_optimizer is not optimizer
+    assert new_agent.dummy_optimizer.networks[0] is new_agent.dummy_actor
+    assert str(new_agent.dummy_actor.state_dict()) == str(
+        agent.dummy_actor.state_dict()
+    )
+
+    # Tensor arguments such as the support of a RainbowQNetwork are compared by value
+    agent = RainbowDQN(observation_space, action_space)
+    agent.save_checkpoint(checkpoint_path)
+
+    new_agent = RainbowDQN(observation_space, action_space)
+    actor = new_agent.actor
+    optimizer = new_agent.optimizer
+    new_agent.load_checkpoint(checkpoint_path)
+
+    assert new_agent.actor is actor
+    assert new_agent.optimizer is optimizer
+    assert str(new_agent.actor.state_dict()) == str(agent.actor.state_dict())
+
+
+class UnfusedAdam(optim.Adam):
+    """Adam optimizer without a fused implementation, like on unsupported devices."""
+
+    def __init__(self, params, lr, fused=None, **kwargs):
+        if fused:
+            raise RuntimeError("`fused=True` is not supported.")
+
+        super().__init__(params, lr=lr, **kwargs)
+
+
+def test_optimizer_wrapper_falls_back_from_fused():
+    actor = EvolvableMLP(4, 4, hidden_size=[8])
+    optimizer_kwargs = {"fused": True, "eps": 1e-6}
+    optimizer = OptimizerWrapper(
+        UnfusedAdam,
+        actor,
+        1e-3,
+        optimizer_kwargs=optimizer_kwargs,
+        network_names=["actor"],
+        lr_name="lr",
+    )
+
+    # The keyword arguments that worked are stored, without modifying those passed
+    assert optimizer.optimizer_kwargs == {"eps": 1e-6}
+    assert optimizer_kwargs == {"fused": True, "eps": 1e-6}
+    assert optimizer.optimizer.defaults["eps"] == 1e-6
+
+
 @pytest.mark.parametrize(
     "device, with_hp_config",
     [
@@ -517,3 +653,30 @@ def test_load_from_pretrained_multi_agent(
     assert new_agent.fitness == agent.fitness
     assert new_agent.steps == agent.steps
     assert new_agent.agent_ids == agent.agent_ids
+
+
+@pytest.mark.parametrize("device", ["cpu", "cuda"])
+def test_load_checkpoints_population(device, tmpdir):
+    if device == "cuda" and not torch.cuda.is_available():
+        pytest.skip("Requires a CUDA device")
+
+    observation_space = generate_random_box_space((4,))
+    action_space = generate_discrete_space(4)
+    population = [
+        DummyRLAlgorithm(observation_space, action_space, index=i) for i in range(3)
+    ]
+
+    paths = []
+    for agent in population:
+        checkpoint_path = Path(tmpdir) / f"checkpoint_{agent.index}.pth"
+        agent.save_checkpoint(checkpoint_path)
+        paths.append(checkpoint_path)
+
+    loaded_population = DummyRLAlgorithm.load_checkpoints(paths, device=device)
+
+    assert len(loaded_population) == len(population)
+    for agent, new_agent in zip(population, loaded_population):
+        assert new_agent.index == agent.index
+        assert str(new_agent.dummy_actor.to("cpu").state_dict()) == str(
+            agent.dummy_actor.state_dict()
+        )
@@ -10,8 +10,10 @@ import torch.optim as optim
 from accelerate import Accelerator
 from accelerate.optimizer import AcceleratedOptimizer
 from gymnasium import spaces
+from torch._dynamo import OptimizedModule
 
 from agilerl.algorithms.dqn_rainbow import RainbowDQN
+from agilerl.hpo.mutation import Mutations
 from agilerl.modules.cnn import EvolvableCNN
 from agilerl.modules.mlp import EvolvableMLP
 from agilerl.networks.q_networks import RainbowQNetwork
@@ -117,6 +119,18 @@ def test_initialize_dqn_with_minimum_parameters():
     assert isinstance(dqn.optimizer.optimizer, optim.Adam)
 
 
+# initialize DQN with torch compiler
+def test_initialize_dqn_with_torch_compiler():
+    observation_space = generate_random_box_space(shape=(4,))
+    action_space = generate_discrete_space(2)
+
+    dqn = RainbowDQN(observation_space, action_space, torch_compiler="default")
+
+    assert dqn.torch_compiler == "default"
+    assert isinstance(dqn.actor, OptimizedModule)
+    assert isinstance(dqn.actor_target, OptimizedModule)
+
+
 @pytest.mark.parametrize(
     "observation_space",
     [
@@ -168,6 +182,38 @@ def test_initialize_dqn_with_incorrect_actor_net_type():
         )
 
 
+# Converts the CNN weights and image observations to channels_last on CUDA devices.
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="Requires a CUDA device")
+def test_initialize_dqn_with_cnn_channels_last():
+    observation_space = spaces.Box(0, 1, shape=(3, 32, 32))
+    action_space = generate_discrete_space(2)
+    net_config_cnn = {
+        "encoder_config": {
+            "channel_size": [3],
+            "kernel_size": [3],
+            "stride_size": [1],
+        }
+    }
+
+    dqn = RainbowDQN(
+        observation_space=observation_space,
+        action_space=action_space,
+        net_config=net_config_cnn,
+        device="cuda",
+    )
+
+    for net in [dqn.actor, dqn.actor_target]:
+        for param in net.parameters():
+            if param.dim() == 4:
+                assert param.is_contiguous(memory_format=torch.channels_last)
+
+    obs = dqn.preprocess_observation(np.random.rand(2, 3, 32, 32))
+    assert obs.is_contiguous(memory_format=torch.channels_last)
+
+    action = dqn.get_action(np.random.rand(2, 3, 32, 32))
+    assert action.shape == (2,)
+
+
 # Initializes actor network with EvolvableCNN based on net_config and Accelerator.
 def test_initialize_dqn_with_cnn_accelerator():
     observation_space = spaces.Box(0, 1, shape=(3, 32, 32))
@@ -324,6 +370,51 @@ def test_returns_expected_action_one_hot(accelerator):
     assert action == 1
 
 
+# Returns the expected action when selecting actions with a quantized actor
+def test_returns_expected_action_quantized():
+    observation_space = generate_random_box_space(shape=(4,))
+    action_space = generate_discrete_space(2)
+    batch_size = 8
+
+    dqn = RainbowDQN(
+        observation_space,
+        action_space,
+        batch_size=batch_size,
+        quantize_inference=True,
+    )
+    state = np.array([[1, 2, 4, 5], [2, 3, 5, 1]])
+
+    action = dqn.get_action(state, np.array([[0, 1], [1, 0]]))
+
+    assert np.array_equal(action, [1, 0])
+    assert dqn._quantized_actor is not None
+    assert dqn._quantized_actor is not dqn.actor
+
+    experiences = [
+        torch.randn(batch_size, *observation_space.shape),
+        torch.randint(0, action_space.n, (batch_size, 1)),
+        torch.randn((batch_size, 1)),
+        torch.randn(batch_size, *observation_space.shape),
+        torch.randint(0, 2, (batch_size, 1)),
+    ]
+    quantized_actor = dqn._quantized_actor
+    dqn.learn(experiences)
+
+    # The quantized actor is only re-quantized, in place, when next selecting actions
+    assert dqn._quantized_actor_stale
+    dqn.get_action(state)
+    assert not dqn._quantized_actor_stale
+    assert dqn._quantized_actor is quantized_actor
+    rebuilt_actor = torch.ao.quantization.quantize_dynamic(
+        dqn.actor, {torch.nn.Linear}, dtype=torch.qint8
+    )
+    assert str(dqn._quantized_actor.state_dict()) == str(rebuilt_actor.state_dict())
+
+    # Init hooks (e.g. after a mutation) discard it
+    dqn.reset_quantized_actor()
+    assert dqn._quantized_actor is None
+
+
 def test_returns_expected_action_mask_vectorized():
     accelerator = Accelerator()
     observation_space = generate_random_box_space(shape=(4,))
@@ -460,6 +551,107 @@ def test_learns_from_experiences_one_hot(accelerator):
     assert actor_target_pre_learn_sd != str(dqn.actor_target.state_dict())
 
 
+# learns from experiences after the batch size has been mutated
+def test_learns_from_experiences_mutated_batch_size():
+    observation_space = generate_random_box_space(shape=(4,))
+    action_space = generate_discrete_space(2)
+    batch_size = 16
+
+    dqn = RainbowDQN(observation_space, action_space, batch_size=64)
+    dqn.batch_size = batch_size
+
+    states = torch.randn(batch_size, *observation_space.shape)
+    actions = torch.randint(0, action_space.n, (batch_size, 1))
+    rewards = torch.randn((batch_size, 1))
+    next_states = torch.randn(batch_size, *observation_space.shape)
+    dones = torch.randint(0, 2, (batch_size, 1))
+
+    experiences = [states, actions, rewards, next_states, dones]
+    loss, _, _ = dqn.learn(experiences)
+
+    assert loss > 0.0
+
+
+# learns from experiences with bfloat16 autocast
+@pytest.mark.parametrize("combined", [True, False])
+def test_learns_from_experiences_mixed_precision(combined):
+    observation_space = generate_random_box_space(shape=(4,))
+    action_space = generate_discrete_space(2)
+    batch_size = 16
+
+    dqn = RainbowDQN(
+        observation_space,
+        action_space,
+        batch_size=batch_size,
+        combined_reward=combined,
+        mixed_precision=True,
+    )
+
+    def make_batch():
+        return [
+            torch.randn(batch_size, *observation_space.shape),
+            torch.randint(0, action_space.n, (batch_size, 1)),
+            torch.randn((batch_size, 1)),
+            torch.randn(batch_size, *observation_space.shape),
+            torch.randint(0, 2, (batch_size, 1)),
+        ]
+
+    actor_pre_learn_sd = str(copy.deepcopy(dqn.actor.state_dict()))
+    experiences = make_batch() + [np.arange(batch_size)] + make_batch()
+    loss, _, _ = dqn.learn(experiences, n_step=True)
+
+    assert loss > 0.0
+    assert actor_pre_learn_sd != str(dqn.actor.state_dict())
+    assert all(param.dtype == torch.float32 for param in dqn.actor.parameters())
+
+
+# learns with the update captured in a CUDA graph, which is rebuilt after mutation and cloning
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="Requires a CUDA device")
+def test_learns_from_experiences_cudagraphs_after_mutation_and_clone():
+    observation_space = generate_random_box_space(shape=(4,))
+    action_space = generate_discrete_space(2)
+
+    def make_batch(batch_size):
+        return [
+            torch.randn(batch_size, *observation_space.shape),
+            torch.randint(0, action_space.n, (batch_size, 1)),
+            torch.randn((batch_size, 1)),
+            torch.randn(batch_size, *observation_space.shape),
+            torch.randint(0, 2, (batch_size, 1)),
+        ]
+
+    dqn = RainbowDQN(
+        observation_space, action_space, batch_size=16, device="cuda", cudagraphs=True
+    )
+    for _ in range(2):
+        loss, _, _ = dqn.learn(make_batch(16))
+        assert torch.isfinite(loss)
+
+    mutations = Mutations(
+        no_mutation=0,
+        architecture=1,
+        new_layer_prob=0.5,
+        parameters=0,
+        activation=0,
+        rl_hp=0,
+        device="cuda",
+    )
+    mutated = mutations.mutation([dqn])[0]
+    for _ in range(2):
+        loss, _, _ = mutated.learn(make_batch(16))
+        assert torch.isfinite(loss)
+
+    clone = mutated.clone()
+    clone.batch_size = 8
+    clone.init_hook()
+    assert clone._update_fn is not mutated._update_fn
+    for _ in range(2):
+        actor_pre_learn_sd = str(copy.deepcopy(clone.actor.state_dict()))
+        loss, _, _ = clone.learn(make_batch(8))
+        assert torch.isfinite(loss)
+        assert actor_pre_learn_sd != str(clone.actor.state_dict())
+
+
 @pytest.mark.parametrize(
     "accelerator, combined",
     [
@@ -576,7 +768,7 @@ def test_learns_from_experiences_per(accelerator, combined):
 
     assert loss > 0.0
     assert isinstance(new_idxs, np.ndarray)
-    assert isinstance(new_priorities, np.ndarray)
+    assert isinstance(new_priorities, torch.Tensor)
     assert np.array_equal(new_idxs, idxs)
     assert actor == dqn.actor
     assert actor_target == dqn.actor_target
@@ -648,7 +840,7 @@ def test_learns_from_experiences_per_n_step(accelerator, combined):
 
     assert loss > 0.0
     assert isinstance(new_idxs, np.ndarray)
-    assert isinstance(new_priorities, np.ndarray)
+    assert isinstance(new_priorities, torch.Tensor)
     assert np.array_equal(new_idxs, idxs)
     assert actor == dqn.actor
     assert actor_target == dqn.actor_target
@@ -703,6 +895,33 @@ def test_soft_update():
     )
 
 
+# Soft update uses the parameters of the cloned networks
+def test_soft_update_after_clone():
+    observation_space = generate_random_box_space(shape=(4,))
+    action_space = generate_discrete_space(2)
+
+    dqn = RainbowDQN(observation_space, action_space)
+    clone_agent = dqn.clone()
+
+    target_params = list(clone_agent.actor_target.parameters())
+    assert all(
+        cached is param
+        for cached, param in zip(clone_agent._target_params, target_params)
+    )
+
+    pre_update = [param.clone() for param in target_params]
+    clone_agent.soft_update()
+
+    expected_params = [
+        clone_agent.tau * eval_param + (1.0 - clone_agent.tau) * target_param
+        for eval_param, target_param in zip(clone_agent.actor.parameters(), pre_update)
+    ]
+    assert all(
+        torch.allclose(expected_param, target_param)
+        for expected_param, target_param in zip(expected_params, target_params)
+    )
+
+
 # Runs algorithm test loop
 def test_algorithm_test_loop():
     observation_space = generate_random_box_space(shape=(4,))
@@ -977,6 +1196,25 @@ def test_save_load_checkpoint_correct_data_and_format(tmpdir):
     assert dqn.steps == [0]
 
 
+# Loaded tensors don't alias the checkpoint file, which can be saved to again
+def test_load_checkpoint_then_save_to_same_path(tmpdir):
+    dqn = RainbowDQN(
+        observation_space=generate_random_box_space(shape=(4,)),
+        action_space=generate_discrete_space(2),
+    )
+    support = dqn.support.clone()
+
+    checkpoint_path = Path(tmpdir) / "checkpoint.pth"
+    dqn.save_checkpoint(checkpoint_path)
+    dqn.load_checkpoint(checkpoint_path)
+
+    # Overwrite the checkpoint with different tensors of the same size
+    dqn.save_checkpoint(checkpoint_path)
+    torch.save({"support": torch.zeros_like(support)}, checkpoint_path)
+
+    assert torch.equal(dqn.support, support)
+
+
 def test_save_load_checkpoint_correct_data_and_format_cnn(tmpdir):
     net_config_cnn = {
         "encoder_config": {
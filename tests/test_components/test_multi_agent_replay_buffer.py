@@ -1,3 +1,6 @@
+import gc
+import weakref
+
 import numpy as np
 import torch
 
@@ -13,7 +16,7 @@ def test_initialize_instance_with_valid_arguments():
     buffer = MultiAgentReplayBuffer(memory_size, field_names, agent_ids)
 
     assert len(buffer) == 0
-    assert buffer.memory.maxlen == memory_size
+    assert len(buffer.memory) == memory_size
     assert buffer.field_names == field_names
     assert buffer.agent_ids == agent_ids
     assert buffer.counter == 0
@@ -40,8 +43,8 @@ def test_get_length_of_memory():
     assert len(buffer) == 3
 
 
-# Can add experiences to memory and appends to end of deque
-def test_append_to_memory_deque():
+# Can add experiences to memory and appends to end of memory
+def test_append_to_memory():
     memory_size = 100
     field_names = ["state", "action", "reward"]
     agent_ids = ["agent1", "agent2"]
@@ -58,7 +61,7 @@ def test_append_to_memory_deque():
     buffer._add(state, action, reward)
     buffer._add(state2, action2, reward2)
 
-    assert len(buffer.memory) == 2
+    assert len(buffer) == 2
     assert buffer.memory[0].state == state
     assert buffer.memory[0].action == action
     assert buffer.memory[0].reward == reward
@@ -89,13 +92,15 @@ def test_add_experience_when_memory_full():
     buffer._add(state2, action2, reward2)
     buffer._add(state3, action3, reward3)
 
-    assert len(buffer.memory) == 2
-    assert buffer.memory[0].state == state2
-    assert buffer.memory[0].action == action2
-    assert buffer.memory[0].reward == reward2
-    assert buffer.memory[1].state == state3
-    assert buffer.memory[1].action == action3
-    assert buffer.memory[1].reward == reward3
+    # Oldest experience is overwritten
+    assert len(buffer) == 2
+    assert buffer.write_idx == 1
+    assert buffer.memory[0].state == state3
+    assert buffer.memory[0].action == action3
+    assert buffer.memory[0].reward == reward3
+    assert buffer.memory[1].state == state2
+    assert buffer.memory[1].action == action2
+    assert buffer.memory[1].reward == reward2
 
 
 # Can add experiences to memory using save_to_memory method
@@ -133,7 +138,7 @@ def test_add_single_experiences_to_memory():
 
     buffer.save_to_memory_single_env(state, action, reward)
 
-    assert len(buffer.memory) == 1
+    assert len(buffer) == 1
     assert buffer.memory[0].state == state
     assert buffer.memory[0].action == action
     assert buffer.memory[0].reward == reward
@@ -165,7 +170,7 @@ def test_add_multiple_experiences_to_memory():
     action2 = {"agent1": np.array([1]), "agent2": np.array([1])}
     reward2 = {"agent1": np.array([1]), "agent2": np.array([1])}
 
-    assert len(buffer.memory) == 2
+    assert len(buffer) == 2
     assert str(buffer.memory[0].state) == str(state1)
     assert str(buffer.memory[0].action) == str(action1)
     assert str(buffer.memory[0].reward) == str(reward1)
@@ -200,7 +205,7 @@ def test_add_any_experiences_to_memory():
     action2 = {"agent1": np.array([1]), "agent2": np.array([1])}
     reward2 = {"agent1": np.array([1]), "agent2": np.array([1])}
 
-    assert len(buffer.memory) == 2
+    assert len(buffer) == 2
     assert str(buffer.memory[0].state) == str(state1)
     assert str(buffer.memory[0].action) == str(action1)
     assert str(buffer.memory[0].reward) == str(reward1)
@@ -214,7 +219,7 @@ def test_add_any_experiences_to_memory():
 
     buffer.save_to_memory(new_state, new_action, new_reward, is_vectorised=False)
 
-    assert len(buffer.memory) == 3
+    assert len(buffer) == 3
     assert str(buffer.memory[2].state) == str(new_state)
     assert str(buffer.memory[2].action) == str(new_action)
     assert str(buffer.memory[2].reward) == str(new_reward)
@@ -242,6 +247,49 @@ def test_add_and_sample_vect_experiences_to_memory():
             assert states[agent][int(env)] == sampled_states[agent][idx].cpu().numpy()
 
 
+def test_async_add_experiences_to_memory():
+    buffer = MultiAgentReplayBuffer(100, ["state", "reward"], ["agent1", "agent2"])
+
+    for i in range(3):
+        state = {"agent1": np.array([i, i]), "agent2": np.array([i, i])}
+        reward = {"agent1": np.array([i]), "agent2": np.array([-i])}
+        buffer.async_add(state, reward)
+
+    buffer.flush()
+
+    assert len(buffer) == 3
+    assert buffer.counter == 3
+    for i in range(3):
+        assert buffer.memory[i].state["agent1"].tolist() == [i, i]
+        assert buffer.memory[i].reward["agent2"].tolist() == [-i]
+
+
+def test_close_stops_writer_thread():
+    buffer = MultiAgentReplayBuffer(100, ["state"], ["agent1"])
+    buffer.async_add({"agent1": np.array([0, 0])})
+    thread = buffer._write_thread
+
+    buffer.close()
+
+    assert not thread.is_alive()
+    assert len(buffer) == 1
+
+
+def test_writer_thread_does_not_keep_buffer_alive():
+    buffer = MultiAgentReplayBuffer(100, ["state"], ["agent1"])
+    buffer.async_add({"agent1": np.array([0, 0])})
+    buffer.flush()
+    thread = buffer._write_thread
+    buffer_ref = weakref.ref(buffer)
+
+    del buffer
+    gc.collect()
+    thread.join(timeout=5)
+
+    assert buffer_ref() is None
+    assert not thread.is_alive()
+
+
 # Can sample experiences from memory using sample method
 def test_sample_experiences_from_memory():
     memory_size = 100
@@ -1,4 +1,6 @@
+import gc
 import random
+import weakref
 from collections import deque, namedtuple
 
 import numpy as np
@@ -43,28 +45,30 @@ def test_get_length_of_memory():
     assert len(buffer) == 3
 
 
-# Can add experiences to memory and appends to end of deque
-def test_append_to_memory_deque():
+# Can add experiences to memory and writes them to the preallocated arrays
+def test_append_to_memory():
     buffer = ReplayBuffer(
         memory_size=1000,
         field_names=["state", "action", "reward", "next_state", "done"],
     )
     buffer._add([0, 0, 0, 0], [1, 1, 1, 1], 1, [0, 0, 0, 0], False)
     buffer._add([1, 1, 1, 1], [2, 2, 2, 2], 2, [1, 1, 1, 1], True)
-    assert len(buffer.memory) == 2
-    assert buffer.memory[0].state == [0, 0, 0, 0]
-    assert buffer.memory[0].action == [1, 1, 1, 1]
-    assert buffer.memory[0].reward == 1
-    assert buffer.memory[0].next_state == [0, 0, 0, 0]
-    assert buffer.memory[0].done is False
-    assert buffer.memory[1].state == [1, 1, 1, 1]
-    assert buffer.memory[1].action == [2, 2, 2, 2]
-    assert buffer.memory[1].reward == 2
-    assert buffer.memory[1].next_state == [1, 1, 1, 1]
-    assert buffer.memory[1].done is True
-
-
-# Can add an experience when memory is full and maxlen is reached
+    assert len(buffer) == 2
+    assert buffer.memory["state"].shape == (1000, 4)
+    assert buffer.memory["reward"].shape == (1000, 1)
+    assert buffer.memory["state"][0].tolist() == [0, 0, 0, 0]
+    assert buffer.memory["action"][0].tolist() == [1, 1, 1, 1]
+    assert buffer.memory["reward"][0].tolist() == [1]
+    assert buffer.memory["next_state"][0].tolist() == [0, 0, 0, 0]
+    assert buffer.memory["done"][0].tolist() == [False]
+    assert buffer.memory["state"][1].tolist() == [1, 1, 1, 1]
+    assert buffer.memory["action"][1].tolist() == [2, 2, 2, 2]
+    assert buffer.memory["reward"][1].tolist() == [2]
+    assert buffer.memory["next_state"][1].tolist() == [1, 1, 1, 1]
+    assert buffer.memory["done"][1].tolist() == [True]
+
+
+# Can add an experience when memory is full, overwriting the oldest experience
 def test_add_experience_when_memory_full():
     buffer = ReplayBuffer(
         memory_size=2,
@@ -73,17 +77,18 @@ def test_add_experience_when_memory_full():
     buffer._add([0, 0, 0, 0], [1, 1, 1, 1], 1, [0, 0, 0, 0], False)
     buffer._add([1, 1, 1, 1], [2, 2, 2, 2], 2, [1, 1, 1, 1], True)
     buffer._add([2, 2, 2, 2], [3, 3, 3, 3], 3, [2, 2, 2, 2], False)
-    assert len(buffer.memory) == 2
-    assert buffer.memory[0].state == [1, 1, 1, 1]
-    assert buffer.memory[0].action == [2, 2, 2, 2]
-    assert buffer.memory[0].reward == 2
-    assert buffer.memory[0].next_state == [1, 1, 1, 1]
-    assert buffer.memory[0].done is True
-    assert buffer.memory[1].state == [2, 2, 2, 2]
-    assert buffer.memory[1].action == [3, 3, 3, 3]
-    assert buffer.memory[1].reward == 3
-    assert buffer.memory[1].next_state == [2, 2, 2, 2]
-    assert buffer.memory[1].done is False
+    assert len(buffer) == 2
+    assert buffer.write_idx == 1
+    assert buffer.memory["state"][0].tolist() == [2, 2, 2, 2]
+    assert buffer.memory["action"][0].tolist() == [3, 3, 3, 3]
+    assert buffer.memory["reward"][0].tolist() == [3]
+    assert buffer.memory["next_state"][0].tolist() == [2, 2, 2, 2]
+    assert buffer.memory["done"][0].tolist() == [False]
+    assert buffer.memory["state"][1].tolist() == [1, 1, 1, 1]
+    assert buffer.memory["action"][1].tolist() == [2, 2, 2, 2]
+    assert buffer.memory["reward"][1].tolist() == [2]
+    assert buffer.memory["next_state"][1].tolist() == [1, 1, 1, 1]
+    assert buffer.memory["done"][1].tolist() == [True]
 
 
 # Can add single experiences to memory with save_to_memory_single_env method
@@ -100,10 +105,10 @@ def test_add_single_experiences_to_memory():
 
     buffer.save_to_memory_single_env(state, action, reward)
 
-    assert len(buffer.memory) == 1
-    assert buffer.memory[0].state.tolist() == state.tolist()
-    assert buffer.memory[0].action.tolist() == action.tolist()
-    assert buffer.memory[0].reward.tolist() == reward.tolist()
+    assert len(buffer) == 1
+    assert buffer.memory["state"][0].tolist() == state.tolist()
+    assert buffer.memory["action"][0].tolist() == action.tolist()
+    assert buffer.memory["reward"][0].tolist() == reward.tolist()
 
 
 # Can add multiple experiences to memory with save_to_memory_vect_envs method
@@ -122,17 +127,67 @@ def test_add_multiple_experiences_to_memory():
 
     buffer.save_to_memory_vect_envs(states, actions, rewards, next_states, dones)
 
-    assert len(buffer.memory) == 2
-    assert buffer.memory[0].state.tolist() == states[0].tolist()
-    assert buffer.memory[0].action.tolist() == actions[0].tolist()
-    assert buffer.memory[0].reward.tolist() == rewards[0].tolist()
-    assert buffer.memory[0].next_state.tolist() == next_states[0].tolist()
-    assert buffer.memory[0].done.tolist() == dones[0].tolist()
-    assert buffer.memory[1].state.tolist() == states[1].tolist()
-    assert buffer.memory[1].action.tolist() == actions[1].tolist()
-    assert buffer.memory[1].reward.tolist() == rewards[1].tolist()
-    assert buffer.memory[1].next_state.tolist() == next_states[1].tolist()
-    assert buffer.memory[1].done.tolist() == dones[1].tolist()
+    assert len(buffer) == 2
+    assert buffer.memory["state"][0].tolist() == states[0].tolist()
+    assert buffer.memory["action"][0].tolist() == actions[0].tolist()
+    assert buffer.memory["reward"][0].tolist() == rewards[0].tolist()
+    assert buffer.memory["next_state"][0].tolist() == next_states[0].tolist()
+    assert buffer.memory["done"][0].tolist() == dones[0].tolist()
+    assert buffer.memory["state"][1].tolist() == states[1].tolist()
+    assert buffer.memory["action"][1].tolist() == actions[1].tolist()
+    assert buffer.memory["reward"][1].tolist() == rewards[1].tolist()
+    assert buffer.memory["next_state"][1].tolist() == next_states[1].tolist()
+    assert buffer.memory["done"][1].tolist() == dones[1].tolist()
+
+
+# Batched experiences wrap around to the start of memory once it is full
+def test_add_multiple_experiences_when_memory_full():
+    buffer = ReplayBuffer(3, ["state", "reward"], "cpu")
+
+    buffer.save_to_memory_vect_envs(np.array([[0, 0], [1, 1]]), np.array([0.0, 1.0]))
+    buffer.save_to_memory_vect_envs(np.array([[2, 2], [3, 3]]), np.array([2.0, 3.0]))
+
+    assert len(buffer) == 3
+    assert buffer.counter == 4
+    assert buffer.write_idx == 1
+    assert buffer.memory["state"].tolist() == [[3, 3], [1, 1], [2, 2]]
+    assert buffer.memory["reward"].tolist() == [[3.0], [1.0], [2.0]]
+    assert buffer.memory["state"].dtype == np.int64
+    assert buffer.memory["reward"].dtype == np.float32
+
+
+# Rewards and dones are stored as float32 whatever the dtype of the first experience
+def test_integer_first_reward_does_not_truncate_later_rewards():
+    buffer = ReplayBuffer(10, ["state", "reward", "done"], "cpu")
+
+    buffer.save_to_memory_single_env(np.array([0, 0]), np.array([0]), np.array([False]))
+    buffer.save_to_memory_single_env(
+        np.array([1, 1]), np.array([0.5]), np.array([True])
+    )
+
+    assert buffer.memory["reward"].dtype == np.float32
+    assert buffer.memory["done"].dtype == np.float32
+    assert buffer.memory["reward"][:2].tolist() == [[0.0], [0.5]]
+    assert buffer.memory["done"][:2].tolist() == [[0.0], [1.0]]
+
+
+def test_store_image_observations_as_state_dtype():
+    buffer = ReplayBuffer(
+        10, ["state", "action", "next_state"], "cpu", state_dtype=np.uint8
+    )
+
+    states = np.random.randint(0, 256, size=(2, 3, 8, 8)).astype(np.float32)
+    actions = np.array([[0.5], [1.5]], dtype=np.float32)
+    buffer.save_to_memory(states, actions, states, is_vectorised=True)
+
+    assert buffer.memory["state"].dtype == np.uint8
+    assert buffer.memory["next_state"].dtype == np.uint8
+    assert buffer.memory["action"].dtype == np.float32
+
+    state, action, next_state, idxs = buffer.sample(2, return_idx=True)
+    assert state.dtype == torch.float32
+    assert torch.equal(state, torch.from_numpy(states[idxs]))
+    assert torch.equal(action, torch.from_numpy(actions[idxs]))
 
 
 # Can handle vectorized and un-vectorized experiences from environment
@@ -153,17 +208,17 @@ def test_add_any_experiences_to_memory():
         states, actions, rewards, next_states, dones, is_vectorised=True
     )
 
-    assert len(buffer.memory) == 2
-    assert buffer.memory[0].state.tolist() == states[0].tolist()
-    assert buffer.memory[0].action.tolist() == actions[0].tolist()
-    assert buffer.memory[0].reward.tolist() == rewards[0].tolist()
-    assert buffer.memory[0].next_state.tolist() == next_states[0].tolist()
-    assert buffer.memory[0].done.tolist() == dones[0].tolist()
-    assert buffer.memory[1].state.tolist() == states[1].tolist()
-    assert buffer.memory[1].action.tolist() == actions[1].tolist()
-    assert buffer.memory[1].reward.tolist() == rewards[1].tolist()
-    assert buffer.memory[1].next_state.tolist() == next_states[1].tolist()
-    assert buffer.memory[1].done.tolist() == dones[1].tolist()
+    assert len(buffer) == 2
+    assert buffer.memory["state"][0].tolist() == states[0].tolist()
+    assert buffer.memory["action"][0].tolist() == actions[0].tolist()
+    assert buffer.memory["reward"][0].tolist() == rewards[0].tolist()
+    assert buffer.memory["next_state"][0].tolist() == next_states[0].tolist()
+    assert buffer.memory["done"][0].tolist() == dones[0].tolist()
+    assert buffer.memory["state"][1].tolist() == states[1].tolist()
+    assert buffer.memory["action"][1].tolist() == actions[1].tolist()
+    assert buffer.memory["reward"][1].tolist() == rewards[1].tolist()
+    assert buffer.memory["next_state"][1].tolist() == next_states[1].tolist()
+    assert buffer.memory["done"][1].tolist() == dones[1].tolist()
 
     new_state = np.array([1, 2])
     new_action = np.array([0])
@@ -175,12 +230,12 @@ def test_add_any_experiences_to_memory():
         new_state, new_action, new_reward, new_next_state, new_done, is_vectorised=False
     )
 
-    assert len(buffer.memory) == 3
-    assert buffer.memory[2].state.tolist() == new_state.tolist()
-    assert buffer.memory[2].action.tolist() == new_action.tolist()
-    assert buffer.memory[2].reward.tolist() == new_reward.tolist()
-    assert buffer.memory[2].next_state.tolist() == new_next_state.tolist()
-    assert buffer.memory[2].done.tolist() == new_done.tolist()
+    assert len(buffer) == 3
+    assert buffer.memory["state"][2].tolist() == new_state.tolist()
+    assert buffer.memory["action"][2].tolist() == new_action.tolist()
+    assert buffer.memory["reward"][2].tolist() == new_reward.tolist()
+    assert buffer.memory["next_state"][2].tolist() == new_next_state.tolist()
+    assert buffer.memory["done"][2].tolist() == new_done.tolist()
 
 
 # Can sample experiences from memory of desired batch size with sample method
@@ -241,114 +296,206 @@ def test_sample_experiences_from_memory_images():
     assert experiences[2].shape == (batch_size, 1)
 
 
-def test_sample_experiences_from_memory_return_idx():
-    action_space = 1
-    memory_size = 100
-    field_names = ["state", "action", "reward"]
-    device = "cpu"
+# Can sample dictionary observations stored in the preallocated arrays
+def test_sample_experiences_from_memory_dicts():
+    buffer = ReplayBuffer(100, ["state", "action", "reward"], "cpu")
 
-    buffer = ReplayBuffer(memory_size, field_names, device)
+    for i in range(3):
+        state = {"vector": np.full(4, i), "image": np.full((3, 16, 16), i)}
+        buffer.save_to_memory_single_env(state, i, float(i))
 
-    # Add experiences to memory
-    buffer.save_to_memory_single_env(np.array([1, 1]), 2, 3)
-    buffer.save_to_memory_single_env(np.array([4, 4]), 5, 6)
-    buffer.save_to_memory_single_env(np.array([7, 7]), 8, 9)
+    assert buffer.memory["state"]["vector"].shape == (100, 4)
+    assert buffer.memory["state"]["image"].shape == (100, 3, 16, 16)
 
-    # Sample experiences from memory
     batch_size = 2
-    experiences = buffer.sample(batch_size, return_idx=True)
-    print(experiences)
-    print(experiences[3])
-    print(len(buffer))
+    experiences = buffer.sample(batch_size)
 
-    assert len(experiences[0]) == batch_size
-    assert len(experiences[1]) == batch_size
-    assert len(experiences[2]) == batch_size
-    assert isinstance(experiences[0], torch.Tensor)
-    assert experiences[0].shape == (batch_size, 2)
-    assert isinstance(experiences[1], torch.Tensor)
-    assert experiences[1].shape == (batch_size, action_space)
-    assert isinstance(experiences[2], torch.Tensor)
-    assert experiences[2].shape == (batch_size, 1)
-    assert any(experiences[3] < len(buffer))
+    assert isinstance(experiences[0], dict)
+    assert experiences[0]["vector"].shape == (batch_size, 4)
+    assert experiences[0]["image"].shape == (batch_size, 3, 16, 16)
+    assert experiences[1].shape == (batch_size, 1)
+    assert torch.equal(experiences[0]["vector"][:, 0:1], experiences[1])
 
 
-# Can process transition from experiences with _process_transition method
-def test_process_transition_from_experiences():
-    action_space = 1
-    memory_size = 100
-    field_names = ["state", "action", "reward"]
-    device = "cpu"
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="Requires a CUDA device")
+def test_sample_experiences_from_memory_pinned_staging():
+    buffer = ReplayBuffer(100, ["state", "action", "reward"], "cuda")
 
-    buffer = ReplayBuffer(memory_size, field_names, device)
+    for i in range(3):
+        buffer.save_to_memory_single_env(np.full(2, i), i, float(i))
 
-    # Create experiences
-    experience1 = buffer.experience(1, 2, 3)
-    experience2 = buffer.experience(4, 5, 6)
-    experiences = [experience1, experience2]
+    reward_ptrs = set()
+    for _ in range(4):
+        experiences = buffer.sample(2)
 
-    # Process transition from experiences
-    transition = buffer._process_transition(experiences)
+        assert all(exp.device.type == "cuda" for exp in experiences)
+        assert torch.equal(experiences[0][:, 0:1], experiences[1])
+        reward_ptrs.add(experiences[2].data_ptr())
 
-    assert isinstance(transition["state"], torch.Tensor)
-    assert transition["state"].shape == (len(experiences), 1)
-    assert isinstance(transition["action"], torch.Tensor)
-    assert transition["action"].shape == (len(experiences), action_space)
-    assert isinstance(transition["reward"], torch.Tensor)
-    assert transition["reward"].shape == (len(experiences), 1)
+    # Float32 fields are returned in the two alternating, reused device buffers
+    assert len(reward_ptrs) == 2
 
+    # All fields are staged in a single pinned buffer per slot
+    assert {key for _, key in buffer._pinned_staging} == {"packed"}
+    assert all(staging.is_pinned() for staging, _ in buffer._pinned_staging.values())
 
-# Can process single transition from experiences with _process_transition method
-def test_process_single_transition_from_experiences():
-    action_space = 1
-    memory_size = 100
-    field_names = ["state", "action", "reward"]
-    device = "cpu"
 
-    buffer = ReplayBuffer(memory_size, field_names, device)
+# Can prefetch a batch of experiences in a background thread
+def test_prefetch_experiences_from_memory():
+    buffer = ReplayBuffer(100, ["state", "action", "reward"], "cpu")
 
-    # Create experiences
-    experience1 = buffer.experience(np.array([1, 1]), 2, 3)
-    experiences = [experience1]
+    for i in range(3):
+        buffer.save_to_memory_single_env(np.full(2, i), i, float(i))
 
-    # Process transition from experiences
-    transition = buffer._process_transition(experiences)
+    future = buffer.prefetch(2)
+    experiences = buffer.sample(2)
 
-    assert isinstance(transition["state"], torch.Tensor)
-    assert transition["state"].shape == (len(experiences), 2)
-    assert isinstance(transition["action"], torch.Tensor)
-    assert transition["action"].shape == (len(experiences), action_space)
-    assert isinstance(transition["reward"], torch.Tensor)
-    assert transition["reward"].shape == (len(experiences), 1)
+    assert experiences is future.result()
+    assert buffer._prefetched is None
+    assert experiences[0].shape == (2, 2)
 
+    # Prefetched batches sampled with different arguments are discarded
+    buffer.prefetch(2)
+    experiences = buffer.sample(3)
 
-# Can process transition from experiences with _process_transition method
-def test_process_transition_from_experiences_images():
-    action_space = 1
-    memory_size = 100
-    field_names = ["state", "action", "reward"]
-    device = "cpu"
+    assert experiences[0].shape == (3, 2)
 
-    buffer = ReplayBuffer(memory_size, field_names, device)
 
-    # Create experiences
-    experience1 = buffer.experience(np.random.rand(3, 128, 128), 2, 3)
-    experience2 = buffer.experience(np.random.rand(3, 128, 128), 5, 6)
-    experiences = [experience1, experience2]
+# Prefetching is interleaved with adding experiences and updating priorities
+def test_prefetch_interleaved_with_add_and_update_priorities():
+    buffer = PrioritizedReplayBuffer(
+        memory_size=64,
+        field_names=["state", "action", "reward", "next_state", "done"],
+        num_envs=1,
+    )
+
+    def add(i):
+        buffer.save_to_memory(
+            np.full(4, i), np.array([i]), np.array([float(i)]), np.full(4, i + 1), 0.0
+        )
+
+    for i in range(8):
+        add(i)
+
+    states, actions, _, next_states, _, _, idxs = buffer.sample(4)
+    for i in range(8, 200):
+        buffer.prefetch(4)
+        add(i)
+        buffer.update_priorities(idxs, np.full(len(idxs), 1.0 + i % 3))
+        states, actions, _, next_states, _, weights, idxs = buffer.sample(4)
+
+        # Every sampled experience is whole and consistent with its index in memory
+        assert torch.equal(states[:, 0:1], actions)
+        assert torch.equal(next_states, states + 1)
+        assert torch.all(weights > 0)
+
+    leaves = buffer.sum_tree.tree[buffer.sum_tree.capacity :][: buffer.memory_size]
+    assert np.isclose(buffer.sum_tree.sum(), leaves.sum())
+
+
+# Prefetched batches use different staging buffers to the batches in use
+def test_prefetch_slot_apart_from_batches_in_use():
+    buffer = MultiStepReplayBuffer(
+        memory_size=100,
+        field_names=["state", "action", "reward", "next_state", "done"],
+        num_envs=1,
+        n_step=1,
+    )
+
+    for i in range(8):
+        buffer.save_to_memory(
+            np.full(4, i), np.array([i]), np.array([float(i)]), np.full(4, i + 1), 0.0
+        )
+
+    for _ in range(3):
+        *_, idxs = buffer.sample(4, return_idx=True)
+        sampled_slot = buffer._slot
+        buffer.sample_from_indices(idxs)
+        indices_slot = buffer._slot
+        buffer.prefetch(4, return_idx=True).result()
+
+        assert buffer._slot not in (sampled_slot, indices_slot)
+
+
+def test_async_add_experiences_to_memory():
+    buffer = ReplayBuffer(100, ["state", "action", "reward"], "cpu")
+
+    for i in range(3):
+        buffer.async_add(np.full(2, i), i, float(i))
+    buffer.async_add(
+        np.array([[3, 3], [4, 4]]),
+        np.array([3, 4]),
+        np.array([3.0, 4.0]),
+        is_vectorised=True,
+    )
+    buffer.flush()
+
+    assert len(buffer) == 5
+    assert buffer.counter == 5
+    assert buffer.memory["state"][:5].tolist() == [[i, i] for i in range(5)]
+    assert buffer.sample(2)[0].shape == (2, 2)
+
+    # Errors raised by the writer thread are raised on the next call
+    buffer.async_add(np.full(3, 5), 5, 5.0)
+    with pytest.raises(ValueError):
+        buffer.flush()
+
+
+# The named tuple transition path is deprecated but still works
+def test_deprecated_experience_transitions():
+    buffer = ReplayBuffer(100, ["state", "reward", "done"], "cpu")
+
+    with pytest.warns(DeprecationWarning):
+        experience = buffer.experience
+    experiences = [experience(np.full(2, i), float(i), False) for i in range(3)]
+
+    with pytest.warns(DeprecationWarning):
+        stacked = ReplayBuffer.stack_transitions([e.state for e in experiences])
+    assert stacked.shape == (3, 2)
+
+    with pytest.warns(DeprecationWarning):
+        transition = buffer._process_transition(experiences, np_array=True)
+    assert transition["state"].tolist() == [[i, i] for i in range(3)]
+    assert transition["reward"].shape == (3, 1)
+    assert transition["done"].dtype == np.uint8
 
-    # Process transition from experiences
-    transition = buffer._process_transition(experiences)
 
-    assert isinstance(transition["state"], torch.Tensor)
-    assert transition["state"].shape == (len(experiences), 3, 128, 128)
-    assert isinstance(transition["action"], torch.Tensor)
-    assert transition["action"].shape == (len(experiences), action_space)
-    assert isinstance(transition["reward"], torch.Tensor)
-    assert transition["reward"].shape == (len(experiences), 1)
+def test_close_stops_writer_thread():
+    buffer = ReplayBuffer(100, ["state", "action", "reward"], "cpu")
+    buffer.async_add(np.full(2, 0), 0, 0.0)
+    buffer.flush()
+    buffer.prefetch(1)
+    thread = buffer._write_thread
 
+    buffer.close()
 
-# Can process transition from experiences with _process_transition method
-def test_process_transition_from_experiences_dicts():
+    assert not thread.is_alive()
+    assert len(buffer) == 1
+    assert buffer._prefetch_executor is None
+
+    # The writer thread is restarted if experiences are added after closing
+    buffer.async_add(np.full(2, 1), 1, 1.0)
+    buffer.flush()
+    assert len(buffer) == 2
+    buffer.close()
+
+
+def test_writer_thread_does_not_keep_buffer_alive():
+    buffer = ReplayBuffer(100, ["state", "action", "reward"], "cpu")
+    buffer.async_add(np.full(2, 0), 0, 0.0)
+    buffer.flush()
+    thread = buffer._write_thread
+    buffer_ref = weakref.ref(buffer)
+
+    del buffer
+    gc.collect()
+    thread.join(timeout=5)
+
+    assert buffer_ref() is None
+    assert not thread.is_alive()
+
+
+def test_sample_experiences_from_memory_return_idx():
     action_space = 1
     memory_size = 100
     field_names = ["state", "action", "reward"]
@@ -356,23 +503,28 @@ def test_process_transition_from_experiences_dicts():
 
     buffer = ReplayBuffer(memory_size, field_names, device)
 
-    # Create experiences
-    sample_state = {"image1": np.random.rand(3, 128, 128), "vec1": np.random.rand(3)}
-    experience1 = buffer.experience(sample_state, 2, 3)
-    experience2 = buffer.experience(sample_state, 5, 6)
-    experiences = [experience1, experience2]
+    # Add experiences to memory
+    buffer.save_to_memory_single_env(np.array([1, 1]), 2, 3)
+    buffer.save_to_memory_single_env(np.array([4, 4]), 5, 6)
+    buffer.save_to_memory_single_env(np.array([7, 7]), 8, 9)
 
-    # Process transition from experiences
-    transition = buffer._process_transition(experiences)
+    # Sample experiences from memory
+    batch_size = 2
+    experiences = buffer.sample(batch_size, return_idx=True)
+    print(experiences)
+    print(experiences[3])
+    print(len(buffer))
 
-    assert isinstance(transition["state"], dict)
-    assert all(isinstance(v, torch.Tensor) for v in transition["state"].values())
-    assert transition["state"]["image1"].shape == (len(experiences), 3, 128, 128)
-    assert transition["state"]["vec1"].shape == (len(experiences), 3)
-    assert isinstance(transition["action"], torch.Tensor)
-    assert transition["action"].shape == (len(experiences), action_space)
-    assert isinstance(transition["reward"], torch.Tensor)
-    assert transition["reward"].shape == (len(experiences), 1)
+    assert len(experiences[0]) == batch_size
+    assert len(experiences[1]) == batch_size
+    assert len(experiences[2]) == batch_size
+    assert isinstance(experiences[0], torch.Tensor)
+    assert experiences[0].shape == (batch_size, 2)
+    assert isinstance(experiences[1], torch.Tensor)
+    assert experiences[1].shape == (batch_size, action_space)
+    assert isinstance(experiences[2], torch.Tensor)
+    assert experiences[2].shape == (batch_size, 1)
+    assert any(experiences[3] < len(buffer))
 
 
 ##### MultiStepReplayBuffer class tests #####
@@ -417,17 +569,17 @@ def test_save_single_env_transition():
 
     replay_buffer.save_to_memory(state, action, reward, next_state, done)
 
-    assert len(replay_buffer.memory) == 0
+    assert len(replay_buffer) == 0
     assert len(replay_buffer.n_step_buffers[0]) == 1
 
     replay_buffer.save_to_memory_single_env(state, action, reward, next_state, done)
 
-    assert len(replay_buffer.memory) == 0
+    assert len(replay_buffer) == 0
     assert len(replay_buffer.n_step_buffers[0]) == 2
 
     replay_buffer.save_to_memory(state, action, reward, next_state, done)
 
-    assert len(replay_buffer.memory) == num_envs
+    assert len(replay_buffer) == num_envs
     assert len(replay_buffer.n_step_buffers[0]) == n_step
 
 
@@ -453,7 +605,7 @@ def test_save_multiple_env_transitions():
         state, action, reward, next_state, done, is_vectorised=True
     )
 
-    assert len(replay_buffer.memory) == 0
+    assert len(replay_buffer) == 0
     assert len(replay_buffer.n_step_buffers[0]) == 1
     assert len(replay_buffer.n_step_buffers[1]) == 1
 
@@ -461,7 +613,7 @@ def test_save_multiple_env_transitions():
         state, action, reward, next_state, done
     )
 
-    assert len(replay_buffer.memory) == num_envs
+    assert len(replay_buffer) == num_envs
     assert len(replay_buffer.n_step_buffers[0]) == n_step
     assert len(replay_buffer.n_step_buffers[1]) == n_step
     assert len(one_step_transition) == len(field_names)
@@ -494,7 +646,7 @@ def test_save_multiple_env_image_transitions():
         state, action, reward, next_state, done, is_vectorised=True
     )
 
-    assert len(replay_buffer.memory) == 0
+    assert len(replay_buffer) == 0
     assert len(replay_buffer.n_step_buffers[0]) == 1
     assert len(replay_buffer.n_step_buffers[1]) == 1
 
@@ -502,7 +654,7 @@ def test_save_multiple_env_image_transitions():
         state, action, reward, next_state, done
     )
 
-    assert len(replay_buffer.memory) == num_envs
+    assert len(replay_buffer) == num_envs
     assert len(replay_buffer.n_step_buffers[0]) == n_step
     assert len(replay_buffer.n_step_buffers[1]) == n_step
     assert len(one_step_transition) == len(field_names)
@@ -678,8 +830,8 @@ def test_add_experience_to_per_memory():
     )
     buffer._add(1, 2, 3, 4, 5)
 
-    assert len(buffer.memory) == 1
-    assert buffer.memory[0] == (1, 2, 3, 4, 5)
+    assert len(buffer) == 1
+    assert tuple(buffer.memory[f][0].item() for f in field_names) == (1, 2, 3, 4, 5)
 
 
 # Save experience to memory and retrieve it
@@ -762,6 +914,40 @@ def test_update_priorities():
     assert torch.equal(updated_transition[4][0], done)
 
 
+# Priorities passed as a tensor are applied at the start of the next sample
+def test_update_priorities_tensor():
+    replay_buffer = PrioritizedReplayBuffer(
+        memory_size=100,
+        field_names=["state", "action", "reward", "next_state", "done"],
+        num_envs=1,
+        alpha=0.6,
+        device="cpu",
+    )
+
+    for _ in range(4):
+        replay_buffer.save_to_memory(
+            np.array([1, 2, 3, 4]),
+            np.array([0]),
+            np.array([0.1]),
+            np.array([5, 6, 7, 8]),
+            np.array([False]),
+        )
+
+    idxs = np.array([0, 2])
+    priorities = torch.tensor([2.0, 3.0])
+    replay_buffer.update_priorities(idxs, priorities)
+
+    assert len(replay_buffer._pending_priorities) == 1
+    assert replay_buffer.sum_tree[2] == 1.0
+
+    replay_buffer.sample(2)
+
+    assert replay_buffer._pending_priorities == []
+    assert replay_buffer.max_priority == 3.0
+    assert np.isclose(replay_buffer.sum_tree[0], 2.0**0.6)
+    assert np.isclose(replay_buffer.sum_tree[2], 3.0**0.6)
+
+
 # Proportions are calculated based on sum_tree
 def test_proportions_calculated_based_on_sum_tree():
     buffer = PrioritizedReplayBuffer(
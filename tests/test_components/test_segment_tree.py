@@ -14,7 +14,7 @@ def test_valid_segment_tree_creation():
     segment_tree = SegmentTree(capacity, operation, init_value)
 
     assert segment_tree.capacity == capacity
-    assert segment_tree.tree == [init_value] * (2 * capacity)
+    assert np.array_equal(segment_tree.tree, [init_value] * (2 * capacity))
     assert segment_tree.operation == operation
 
 
@@ -91,6 +91,40 @@ def test_prefixsum_idx2():
     assert tree.retrieve(5.50) == 3
 
 
+def test_prefixsum_idx_batch():
+    tree = SumSegmentTree(4)
+
+    tree[0] = 0.5
+    tree[1] = 1.0
+    tree[2] = 1.0
+    tree[3] = 3.0
+
+    upperbounds = [0.00, 0.55, 0.99, 1.51, 3.00, 5.50]
+    idxs = tree.retrieve_batch(upperbounds)
+
+    assert idxs.tolist() == [tree.retrieve(ub) for ub in upperbounds]
+
+
+def test_tree_update_batch():
+    sum_tree = SumSegmentTree(4)
+    min_tree = MinSegmentTree(4)
+
+    sum_tree.update([0, 2, 3], [1.0, 0.5, 3.0])
+    min_tree.update([0, 2, 3], [1.0, 0.5, 3.0])
+
+    assert np.isclose(sum_tree.sum(), 4.5)
+    assert np.isclose(sum_tree.sum(0, 3), 1.5)
+    assert np.isclose(sum_tree[2], 0.5)
+    assert np.isclose(min_tree.min(), 0.5)
+    assert np.isclose(min_tree.min(3, 4), 3.0)
+
+    sum_tree.update([2], [4.0])
+    min_tree.update([2], [4.0])
+
+    assert np.isclose(sum_tree.sum(), 8.0)
+    assert np.isclose(min_tree.min(), 1.0)
+
+
 def test_max_interval_tree():
     tree = MinSegmentTree(4)
 
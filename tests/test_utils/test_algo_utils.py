@@ -5,7 +5,12 @@ import torch.nn as nn
 from accelerate import Accelerator
 from gymnasium import spaces
 
-from agilerl.utils.algo_utils import apply_image_normalization, unwrap_optimizer
+from agilerl.utils.algo_utils import (
+    apply_image_normalization,
+    chkpt_attribute_to_device,
+    packed_to_device,
+    unwrap_optimizer,
+)
 
 
 @pytest.mark.parametrize("distributed", [(True), (False)])
@@ -100,6 +105,56 @@ def test_different_ranges():
     np.testing.assert_array_almost_equal(result, expected)
 
 
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="Requires a CUDA device")
+def test_packed_to_device():
+    tensors = [
+        torch.randn(4, 3),
+        torch.randint(0, 5, (4, 1)),
+        torch.randn(4, 1),
+        torch.zeros(4, 2, dtype=torch.bool),
+    ]
+    moved = packed_to_device(tensors, "cuda")
+
+    assert len(moved) == len(tensors)
+    for original, result in zip(tensors, moved):
+        assert result.device.type == "cuda"
+        assert result.dtype == original.dtype
+        assert torch.equal(result.cpu(), original)
+
+
+def test_packed_to_device_cpu():
+    tensors = [torch.randn(4, 3), torch.randint(0, 5, (4, 1))]
+    moved = packed_to_device(tensors, "cpu")
+
+    for original, result in zip(tensors, moved):
+        assert torch.equal(result, original)
+
+
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="Requires a CUDA device")
+def test_chkpt_attribute_to_device_nested():
+    weight = torch.randn(3, 2)
+    bias = torch.randn(2)
+    steps = torch.tensor(10)
+    chkpt = {
+        "state_dict": {"weight": weight, "bias": bias},
+        "opt_states": [{"step": steps}, {}],
+        "lr": 0.01,
+    }
+    moved = chkpt_attribute_to_device(chkpt, "cuda")
+
+    assert moved is chkpt
+    assert moved["state_dict"]["weight"].device.type == "cuda"
+    assert torch.equal(moved["state_dict"]["weight"].cpu(), weight)
+    assert moved["opt_states"][0]["step"].device.type == "cuda"
+    assert torch.equal(moved["opt_states"][0]["step"].cpu(), steps)
+    assert moved["lr"] == 0.01
+
+    # Moved tensors own their storage rather than viewing a shared buffer
+    moved_weight = moved["state_dict"]["weight"]
+    assert moved_weight.untyped_storage().nbytes() == weight.numel() * 4
+    assert torch.equal(moved["state_dict"]["bias"].cpu(), bias)
+
+
 # Helper function to check warning was raised
 def assert_warning_raised(warning_list, expected_message):
     assert any(expected_message in str(w.message) for w in warning_list)